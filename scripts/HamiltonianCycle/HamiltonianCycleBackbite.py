@@ -1,16 +1,24 @@
 import sys
-import random
-from config import N, SVG_SIZE, MARGIN
+import numpy as np
+from config import N
+from grid import DirectionGrid
+from backbite_engine import BackbiteChain, BACKENDS
+from mixing import MixingMonitor
+from html_writer import write_cycle_html
 
 # Increase recursion depth just in case
 sys.setrecursionlimit(2000)
 
 class HamiltonianCycleBackbite:
-    def __init__(self, N=N):
+    def __init__(self, N=N, backend='array', seed=None, grid=None):
         if N % 2 != 0:
             raise ValueError("N must be even for Hamiltonian Cycle on grid")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown path backend '{backend}', expected one of {sorted(BACKENDS)}")
         self.N = N
-        self.grid = [[0 for _ in range(N)] for _ in range(N)]
+        self.backend = backend
+        self.rng = np.random.default_rng(seed)
+        self.grid = DirectionGrid(N) if grid is None else grid
 
         # Directions
         self.LEFT = 1
@@ -18,7 +26,7 @@ class HamiltonianCycleBackbite:
         self.RIGHT = 3
         self.DOWN = 4
 
-    def solve(self):
+    def solve(self, iterations=None, target_ess=None, max_iterations=None, min_length=50, close_steps=None):
         # 1. Initialize with a simple snake path (Hamiltonian Cycle)
         # 0,0 -> 0,N-1
         # 1,N-1 -> 1,0
@@ -68,7 +76,14 @@ class HamiltonianCycleBackbite:
         # 2. Perform Backbite Moves (Markov Chain Monte Carlo)
         # Number of iterations determines how "random" the result is.
         # For N=16 (256 nodes), ~N^3 or N^4 iterations are good.
-        iterations = self.N * self.N * self.N * 10 # 256*16*10 = 40960
+        # With target_ess set, the chain instead runs until the observables
+        # it tracks (see mixing.py) have that many effective samples, and the
+        # series is at least min_length autocorrelation times long for the
+        # estimate to be trusted (so the ESS is at least min_length too).
+        if iterations is None:
+            iterations = self.N * self.N * self.N * 10 # 256*16*10 = 40960
+        if max_iterations is None:
+            max_iterations = self.N * self.N * self.N * 100
 
         # To perform backbite, we need to treat the cycle as a path temporarily.
         # Or we can view a backbite move on a cycle as:
@@ -191,139 +206,58 @@ class HamiltonianCycleBackbite:
         #       Yes! This works. The segment v0...vk-1 is reversed and attached to vk.
 
         # Data structure:
-        # Since we need to reverse segments frequently, a simple list is O(N).
-        # N=256, so O(N) is cheap enough.
+        # Reversals and rotations happen on every move, so the path lives in
+        # a position-indexed ring buffer (see backbite_engine.py): finding a
+        # node is O(1), a reversal only touches the shorter side of the path
+        # and closing/re-breaking the cycle is an O(1) rotation.
+        # For big grids the 'treap' backend does every move in O(log n).
 
         # Convert adj to list path
         path = self.extract_path_from_cycle()
-
-        for _ in range(iterations):
-            # path[0] is L, path[-1] is R.
-            # Randomly pick L or R to act
-            if random.random() < 0.5:
-                # Act on path[0]
-                active_end = path[0]
-                other_end = path[-1]
-                idx_active = 0
-            else:
-                # Act on path[-1]
-                active_end = path[-1]
-                other_end = path[0]
-                idx_active = -1
-
-            # Get valid neighbors of active_end in grid
-            r, c = active_end
-            nbs = []
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < self.N and 0 <= nc < self.N:
-                    nbs.append((nr, nc))
-
-            # Choose a random neighbor
-            target = random.choice(nbs)
-
-            # Case 1: Target is the OTHER endpoint -> Cycle found!
-            if target == other_end:
-                # We found a cycle.
-                # To mix more, we "bounce" off the cycle by immediately breaking a random edge.
-                # Just rotate the path randomly to pick a new start/end?
-                # Or just keep the cycle and break a random edge.
-                # For simplicity in list representation:
-                # If we connect ends, the path is a ring.
-                # We can "rotate" the ring to any offset and break connection there.
-
-                # Effectively: path is cyclic.
-                # Pick random index i.
-                # New path = path[i+1:] + path[:i+1]
-                cut = random.randint(0, len(path)-2)
-                path = path[cut+1:] + path[:cut+1]
-                continue
-
-            # Case 2: Target is adjacent in path (already connected)
-            # e.g. target is path[1] (if active is path[0])
-            # Do nothing.
-            if (idx_active == 0 and target == path[1]) or \
-               (idx_active == -1 and target == path[-2]):
-                continue
-
-            # Case 3: Target is some internal node
-            # Perform Reversal Move.
-            # Find index of target
-            try:
-                k = path.index(target)
-            except ValueError:
-                # Should not happen if logic is correct
-                continue
-
-            if idx_active == 0:
-                # Active is v0. Target is vk.
-                # Old Path: v0 ... vk-1, vk, vk+1 ... vn
-                # New Path: v{k-1} ... v0, vk, vk+1 ... vn
-                # Segment 0 to k-1 is reversed.
-                # Python slicing: path[0:k] needs reversal.
-                # New path = reversed(path[0:k]) + path[k:]
-                path = path[0:k][::-1] + path[k:]
-            else:
-                # Active is vn. Target is vk.
-                # Old Path: v0 ... vk-1, vk, vk+1 ... vn
-                # New Path: v0 ... vk-1, vk, vn, vn-1 ... v{k+1}
-                # Segment k+1 to n is reversed.
-                # path[k+1:] needs reversal.
-                # New path = path[:k+1] + reversed(path[k+1:])
-                path = path[:k+1] + path[k+1:][::-1]
+        chain = BackbiteChain(self.N, [r * self.N + c for r, c in path], BACKENDS[self.backend], self.rng)
+
+        if target_ess is None:
+            for _ in range(iterations):
+                chain.step()
+            self.stats = {'iterations': iterations}
+        else:
+            self.stats = self.mix_adaptive(chain, target_ess, max_iterations, min_length)
+            print(f"Backbite: {self.stats['iterations']} iterations, "
+                  f"tau ~ {self.stats['tau']:.0f} moves, ESS ~ {self.stats['ess']:.1f} "
+                  f"(target {target_ess}, series >= {min_length} tau)")
 
         # Final step: Ensure we have a cycle
         # The loop above runs for 'iterations'. The path might not be closed at the end.
-        # We need to run until it closes.
-        while True:
-            # Check if closed
-            head, tail = path[0], path[-1]
-            # Check adjacency
-            is_adjacent = False
-            r, c = head
-            if abs(head[0]-tail[0]) + abs(head[1]-tail[1]) == 1:
-                is_adjacent = True
-
-            if is_adjacent:
-                # We are done!
-                break
-
-            # Perform one more step to try to close
-            # (Copy paste logic from above)
-            if random.random() < 0.5:
-                active_end = path[0]
-                idx_active = 0
-            else:
-                active_end = path[-1]
-                idx_active = -1
-
-            r, c = active_end
-            nbs = []
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < self.N and 0 <= nc < self.N:
-                    nbs.append((nr, nc))
-
-            target = random.choice(nbs)
-
-            if (idx_active == 0 and target == path[1]) or \
-               (idx_active == -1 and target == path[-2]):
-                continue
-
-            try:
-                k = path.index(target)
-            except ValueError:
-                continue
-
-            if idx_active == 0:
-                path = path[0:k][::-1] + path[k:]
-            else:
-                path = path[:k+1] + path[k+1:][::-1]
+        # We need to run until it closes; chain.close_bounded() keeps the chain
+        # going but takes a move that makes the ends adjacent as soon as one
+        # exists, within close_steps moves (see backbite_engine.py).
+        steps, steered = chain.close_bounded(close_steps)
+        self.stats['closing_steps'] = steps + steered
+        self.stats['closing_steered'] = steered
 
         # Convert path to grid format
-        self.path_to_grid(path)
+        self.path_to_grid(chain.cells())
         return True
 
+    def mix_adaptive(self, chain, target_ess, max_iterations, min_length=50):
+        # Sample the turn count and the number of horizontal edges once per
+        # sweep (N*N moves) and stop as soon as the slower of the two has
+        # reached target_ess effective samples over a series of at least
+        # min_length autocorrelation times, or at max_iterations.
+        chain.track_observables()
+        monitor = MixingMonitor(min_length=min_length)
+        interval = self.N * self.N
+        moves = 0
+        while moves < max_iterations:
+            for _ in range(interval):
+                chain.step()
+            moves += interval
+            monitor.add(chain.turns, chain.horizontal)
+            if monitor.converged(target_ess):
+                break
+        return {'iterations': moves, 'tau': monitor.tau * interval, 'ess': monitor.ess,
+                'target_ess': target_ess, 'min_length': min_length}
+
     def add_edge(self, u, v):
         if u not in self.adj: self.adj[u] = []
         if v not in self.adj: self.adj[v] = []
@@ -378,73 +312,23 @@ class HamiltonianCycleBackbite:
             r, c = u
             nr, nc = v
 
-            if nr == r and nc == c - 1: self.grid[r][c] = self.LEFT
-            elif nr == r and nc == c + 1: self.grid[r][c] = self.RIGHT
-            elif nr == r - 1 and nc == c: self.grid[r][c] = self.UP
-            elif nr == r + 1 and nc == c: self.grid[r][c] = self.DOWN
+            if nr == r and nc == c - 1: self.grid[r, c] = self.LEFT
+            elif nr == r and nc == c + 1: self.grid[r, c] = self.RIGHT
+            elif nr == r - 1 and nc == c: self.grid[r, c] = self.UP
+            elif nr == r + 1 and nc == c: self.grid[r, c] = self.DOWN
 
     def print_grid(self):
         for y in range(self.N):
             row_str = []
             for x in range(self.N):
-                row_str.append(str(self.grid[y][x]))
+                row_str.append(str(self.grid[y, x]))
             print(",".join(row_str) + ",")
         print("\n----------\n")
 
-    def generate_html(self, filename="HamiltonianCycleBackbite.html"):
-        available_size = SVG_SIZE - 2 * MARGIN
-        cell_size = available_size / self.N
-
-        width = SVG_SIZE
-        height = SVG_SIZE
-
-        svg_content = [f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">']
-
-        # Draw Path
-        for y in range(self.N):
-            for x in range(self.N):
-                direction = self.grid[y][x]
-                if direction == 0: continue
-
-                x1 = MARGIN + x * cell_size + cell_size // 2
-                y1 = MARGIN + y * cell_size + cell_size // 2
-
-                dx, dy = 0, 0
-                if direction == self.LEFT: dx = -1
-                elif direction == self.UP: dy = -1
-                elif direction == self.RIGHT: dx = 1
-                elif direction == self.DOWN: dy = 1
-
-                x2 = x1 + dx * cell_size
-                y2 = y1 + dy * cell_size
-
-                stroke_width = max(1, cell_size * 0.1)
-                svg_content.append(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="#007bff" stroke-width="{stroke_width}" />')
-                radius = max(1, cell_size * 0.1)
-                svg_content.append(f'<circle cx="{x1}" cy="{y1}" r="{radius}" fill="#007bff" />')
-
-        svg_content.append('</svg>')
-
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Hamiltonian Cycle Backbite {self.N}x{self.N}</title>
-    <style>
-        body {{ font-family: sans-serif; text-align: center; padding: 0; margin: 0; }}
-        h1 {{ margin: 10px; }}
-        svg {{ border: 1px solid #ccc; background: #f9f9f9; }}
-    </style>
-</head>
-<body>
-    <h1>Hamiltonian Cycle Backbite ({self.N}x{self.N})</h1>
-    {"".join(svg_content)}
-</body>
-</html>
-"""
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        print(f"HTML visualization saved to {filename}")
+    def generate_html(self, filename="HamiltonianCycleBackbite.html", mode="path", compress=None):
+        # mode "path", "lines" or "canvas", gzip output with compress=True or
+        # a .gz filename (see html_writer.py)
+        write_cycle_html(filename, "Hamiltonian Cycle Backbite", self.grid, mode, compress=compress)
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -453,7 +337,10 @@ if __name__ == "__main__":
         except:
             pass
 
-    solver = HamiltonianCycleBackbite(N)
+    # Optional path backend: 'array' (default) or 'treap'
+    backend = sys.argv[2] if len(sys.argv) > 2 else 'array'
+
+    solver = HamiltonianCycleBackbite(N, backend)
     if solver.solve():
         solver.print_grid()
         solver.generate_html("HamiltonianCycleBackbite.html")
@@ -1,17 +1,21 @@
 import sys
-import random
+import numpy as np
 from PIL import Image, ImageDraw
 from config import N, SVG_SIZE, MARGIN
+from grid import DirectionGrid
+from backbite_engine import BackbiteChain
+from gif_writer import GifWriter
 
 # Increase recursion depth just in case
 sys.setrecursionlimit(2000)
 
 class HamiltonianCycleGIF:
-    def __init__(self, N=N):
+    def __init__(self, N=N, seed=None, grid=None):
         if N % 2 != 0:
             raise ValueError("N must be even for Hamiltonian Cycle on grid")
         self.N = N
-        self.grid = [[0 for _ in range(N)] for _ in range(N)]
+        self.grid = DirectionGrid(N) if grid is None else grid
+        self.rng = np.random.default_rng(seed)
 
         # Directions
         self.LEFT = 1
@@ -24,9 +28,28 @@ class HamiltonianCycleGIF:
         self.height = SVG_SIZE
         self.margin = MARGIN
         self.cell_size = (self.width - 2 * self.margin) / self.N
-        self.frames = []
 
-    def solve(self, steps=1000, frame_interval=10):
+        # Frame rasterizer tables:
+        # - pixel center of every row / column (the same pixels PIL picked
+        #   for the old per-segment draw.line calls)
+        # - gradient LUT, color of path segment i from start (Blue) to end
+        #   (Red), one RGBX pixel per uint32
+        # - pixel offsets along a segment (clamped to its far end) and across
+        #   it (3px wide)
+        # - one RGBX buffer reused by every frame, written through a flat
+        #   uint32 view so a pixel is a single element
+        self.centers = (self.margin + np.arange(self.N) * self.cell_size + self.cell_size // 2).astype(np.intp)
+        t = np.arange(self.N * self.N) / (self.N * self.N)
+        gradient = np.zeros((self.N * self.N, 4), dtype=np.uint8)
+        gradient[:, 0] = (255 * t).astype(np.uint8)
+        gradient[:, 2] = (255 * (1 - t)).astype(np.uint8)
+        self.gradient = gradient.view(np.uint32).ravel()
+        self.along = np.arange(int(np.diff(self.centers).max(initial=0)) + 1)
+        self.across = np.arange(-1, 2)
+        self.buffer = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        self.pixels = self.buffer.view(np.uint32).ravel()
+
+    def solve(self, steps=1000, frame_interval=10, filename='HamiltonianCycleBackbiteGIF.gif'):
         # 1. Initialize with a simple snake path (Hamiltonian Cycle)
         # adj[u] = {v1, v2}
         self.adj = {}
@@ -52,106 +75,33 @@ class HamiltonianCycleGIF:
 
         # Convert to path list for Backbite
         path = self.extract_path_from_cycle()
+        chain = BackbiteChain(self.N, [r * self.N + c for r, c in path], rng=self.rng)
 
-        # Capture initial frame
-        self.frames.append(self.draw_frame(path))
+        # Frames are encoded and written as they are drawn (see gif_writer.py)
+        with GifWriter(filename, duration=200, loop=0) as gif:
+            # Capture initial frame
+            gif.write(self.draw_frame(chain.path.nodes()))
 
-        # 2. Perform Backbite Moves and Capture Frames
-        print(f"Generating {steps} steps of evolution...")
+            # 2. Perform Backbite Moves and Capture Frames
+            print(f"Generating {steps} steps of evolution...")
 
-        for step in range(steps):
-            # Backbite logic (one step)
-            if random.random() < 0.5:
-                active_end = path[0]
-                idx_active = 0
-            else:
-                active_end = path[-1]
-                idx_active = -1
-
-            r, c = active_end
-            nbs = []
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < self.N and 0 <= nc < self.N:
-                    nbs.append((nr, nc))
-
-            target = random.choice(nbs)
+            for step in range(steps):
+                # Backbite logic (one step)
+                chain.step()
 
-            # Case 1: Close cycle (just rotate)
-            if (idx_active == 0 and target == path[-1]) or \
-               (idx_active == -1 and target == path[0]):
-                cut = random.randint(0, len(path)-2)
-                path = path[cut+1:] + path[:cut+1]
-
-            # Case 2: Adjacent in path (ignore)
-            elif (idx_active == 0 and target == path[1]) or \
-                 (idx_active == -1 and target == path[-2]):
-                pass
-
-            # Case 3: Reversal
-            else:
-                try:
-                    k = path.index(target)
-                    if idx_active == 0:
-                        path = path[0:k][::-1] + path[k:]
-                    else:
-                        path = path[:k+1] + path[k+1:][::-1]
-                except ValueError:
-                    pass
-
-            # Capture frame every 'frame_interval' steps
-            if step % frame_interval == 0:
-                self.frames.append(self.draw_frame(path))
-
-        # Ensure closure at the end
-        print("Finalizing cycle...")
-        max_attempts = 10000
-        for _ in range(max_attempts):
-            head, tail = path[0], path[-1]
-            if abs(head[0]-tail[0]) + abs(head[1]-tail[1]) == 1:
-                break
-
-            # One more step
-            if random.random() < 0.5:
-                active_end = path[0]
-                idx_active = 0
-            else:
-                active_end = path[-1]
-                idx_active = -1
+                # Capture frame every 'frame_interval' steps
+                if step % frame_interval == 0:
+                    gif.write(self.draw_frame(chain.path.nodes()))
 
-            r, c = active_end
-            nbs = []
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < self.N and 0 <= nc < self.N:
-                    nbs.append((nr, nc))
+            # Ensure closure at the end
+            print("Finalizing cycle...")
+            closing_steps = sum(chain.close_bounded())
+            print(f"Closed after {closing_steps} extra steps")
 
-            target = random.choice(nbs)
+            gif.write(self.draw_frame(chain.path.nodes(), is_closed=True))
+        print(f"Done! Saved to {filename}")
 
-            if (idx_active == 0 and target == path[1]) or \
-               (idx_active == -1 and target == path[-2]):
-                continue
-
-            try:
-                k = path.index(target)
-                if idx_active == 0:
-                    path = path[0:k][::-1] + path[k:]
-                else:
-                    path = path[:k+1] + path[k+1:][::-1]
-            except ValueError:
-                continue
-
-        self.frames.append(self.draw_frame(path, is_closed=True))
-
-        # Save GIF
-        print("Saving GIF...")
-        self.frames[0].save('HamiltonianCycleBackbiteGIF.gif',
-                           save_all=True,
-                           append_images=self.frames[1:],
-                           optimize=False,
-                           duration=200,
-                           loop=0)
-        print("Done! Saved to HamiltonianCycleBackbiteGIF.gif")
+        path = chain.cells()
 
         # Update final grid state for printing
         self.path_to_grid(path)
@@ -183,38 +133,33 @@ class HamiltonianCycleGIF:
         return path
 
     def draw_frame(self, path, is_closed=False):
-        img = Image.new('RGB', (self.width, self.height), color='white')
+        # path: cell ids (r * N + c) from head to tail
+        self.buffer.fill(255)
+
+        r, c = np.divmod(np.asarray(path, dtype=np.intp), self.N)
+        y = self.centers[r]
+        x = self.centers[c]
+
+        # Segment i joins path[i] and path[i+1]. Every segment is axis-aligned,
+        # so it covers a 3px wide strip: the rows (or columns) across it times
+        # the pixels from its low to its high end along it
+        horizontal = y[:-1] == y[1:]
+        lo = np.where(horizontal, np.minimum(x[:-1], x[1:]), np.minimum(y[:-1], y[1:]))
+        hi = np.where(horizontal, np.maximum(x[:-1], x[1:]), np.maximum(y[:-1], y[1:]))
+        along = np.minimum(lo[:, None] + self.along, hi[:, None])[:, None, :]
+        across = (np.where(horizontal, y[:-1], x[:-1])[:, None] + self.across)[:, :, None]
+        horizontal = horizontal[:, None, None]
+        index = np.where(horizontal, across * self.width + along, along * self.width + across)
+
+        # One scatter for all segments, later segments win on shared pixels
+        # like they did with one draw.line per segment
+        self.pixels[index] = self.gradient[:len(path) - 1, None, None]
+        img = Image.frombytes('RGB', (self.width, self.height), self.buffer, 'raw', 'RGBX')
         draw = ImageDraw.Draw(img)
 
-        # Draw path segments
-        # Color gradient? Or just simple color.
-        # Let's use a gradient from start (Blue) to end (Red) to visualize the snake nature
-        n = len(path)
-        for i in range(n - 1):
-            u = path[i]
-            v = path[i+1]
-
-            x1 = self.margin + u[1] * self.cell_size + self.cell_size // 2
-            y1 = self.margin + u[0] * self.cell_size + self.cell_size // 2
-            x2 = self.margin + v[1] * self.cell_size + self.cell_size // 2
-            y2 = self.margin + v[0] * self.cell_size + self.cell_size // 2
-
-            # Interpolate color
-            r_val = int(255 * (i / n))
-            b_val = int(255 * (1 - i / n))
-            color = (r_val, 0, b_val)
-
-            draw.line([(x1, y1), (x2, y2)], fill=color, width=3)
-            # draw.rectangle([x1-2, y1-2, x1+2, y1+2], fill=color)
-
         # Highlight endpoints
-        head = path[0]
-        tail = path[-1]
-
-        hx = self.margin + head[1] * self.cell_size + self.cell_size // 2
-        hy = self.margin + head[0] * self.cell_size + self.cell_size // 2
-        tx = self.margin + tail[1] * self.cell_size + self.cell_size // 2
-        ty = self.margin + tail[0] * self.cell_size + self.cell_size // 2
+        hx, hy = int(x[0]), int(y[0])
+        tx, ty = int(x[-1]), int(y[-1])
 
         draw.ellipse([hx-4, hy-4, hx+4, hy+4], fill='blue', outline='black') # Start
         draw.ellipse([tx-4, ty-4, tx+4, ty+4], fill='red', outline='black')  # End
@@ -231,10 +176,10 @@ class HamiltonianCycleGIF:
             v = path[(i+1)%n]
             r, c = u
             nr, nc = v
-            if nr == r and nc == c - 1: self.grid[r][c] = self.LEFT
-            elif nr == r and nc == c + 1: self.grid[r][c] = self.RIGHT
-            elif nr == r - 1 and nc == c: self.grid[r][c] = self.UP
-            elif nr == r + 1 and nc == c: self.grid[r][c] = self.DOWN
+            if nr == r and nc == c - 1: self.grid[r, c] = self.LEFT
+            elif nr == r and nc == c + 1: self.grid[r, c] = self.RIGHT
+            elif nr == r - 1 and nc == c: self.grid[r, c] = self.UP
+            elif nr == r + 1 and nc == c: self.grid[r, c] = self.DOWN
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
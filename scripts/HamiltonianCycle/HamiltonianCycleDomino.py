@@ -1,16 +1,46 @@
 import sys
-import random
-from config import N, SVG_SIZE, MARGIN
-
-# Increase recursion depth just in case
-sys.setrecursionlimit(2000)
+import numpy as np
+from config import N
+from grid import DirectionGrid, successors
+from rng import IntStream
+from components import UnionFind, label_matching_cycles
+from html_writer import write_cycle_html
+
+class CandidateSet:
+    # Set with O(1) add / discard / uniform random pick
+    # (items in a list, item -> list position in a dict; discard swaps the
+    # last item into the freed slot)
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        i = self.index.pop(item, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.index[last] = i
+
+    def pick(self, rng):
+        return self.items[rng.integers(len(self.items))]
 
 class HamiltonianCycleDomino:
-    def __init__(self, N=N):
+    def __init__(self, N=N, seed=None, grid=None):
         if N % 2 != 0:
             raise ValueError("N must be even for Domino Tiling")
         self.N = N
-        self.grid = [[0 for _ in range(N)] for _ in range(N)]
+        self.grid = DirectionGrid(N) if grid is None else grid
+        self.rng = np.random.default_rng(seed)
 
         # Directions
         self.LEFT = 1
@@ -18,222 +48,290 @@ class HamiltonianCycleDomino:
         self.RIGHT = 3
         self.DOWN = 4
 
-    def solve(self):
+    def solve(self, shuffle='sweep', max_repairs=20):
+        # shuffle: 'sweep' randomizes the tilings with vectorized checkerboard
+        # sweeps, 'random' with single windows at random positions
+        if shuffle not in ('sweep', 'random'):
+            raise ValueError(f"Unknown shuffle mode '{shuffle}', expected 'sweep' or 'random'")
+
+        # How often each path was taken
+        self.stats = {'merges': 0, 'repairs': 0, 'restarts': 0}
+
+        # When merging gets stuck, the overlay is first repaired locally (see
+        # repair()); new tilings are only generated when max_repairs local
+        # repairs in a row did not help. Restarts are a plain loop, not
+        # recursion.
+        while True:
+            graph, labels = self.build_overlay(shuffle)
+            if self.merge_cycles(graph, labels, max_repairs):
+                break
+            self.stats['restarts'] += 1
+            print("Local repairs failed. Restarting...")
+
+        # 7. Convert Graph to Grid Directions
+        self.graph_to_grid(graph)
+        return True
+
+    def build_overlay(self, shuffle):
         # 1. Generate a random tiling T1 (Horizontal initialization)
-        self.grid = [[0 for _ in range(self.N)] for _ in range(self.N)]
+        self.grid.fill(0)
         for r in range(self.N):
             for c in range(0, self.N, 2):
-                self.grid[r][c] = self.RIGHT
-                self.grid[r][c+1] = self.LEFT
+                self.grid[r, c] = self.RIGHT
+                self.grid[r, c+1] = self.LEFT
 
         # Shuffle T1
-        iterations = self.N * self.N * 5
-        for _ in range(iterations):
-            r = random.randint(0, self.N - 2)
-            c = random.randint(0, self.N - 2)
-            self.shuffle_window(self.grid, r, c)
+        self.shuffle_tiling(self.grid, shuffle)
 
         # T1 Adjacency
-        t1_adj = self.grid_to_adj(self.grid)
+        t1 = self.grid_to_adj(self.grid)
 
         # 2. Generate a random tiling T2 (Vertical initialization)
-        t2_grid = [[0 for _ in range(self.N)] for _ in range(self.N)]
+        t2_grid = DirectionGrid(self.N)
         for c in range(self.N):
             for r in range(0, self.N, 2):
-                t2_grid[r][c] = self.DOWN
-                t2_grid[r+1][c] = self.UP
+                t2_grid[r, c] = self.DOWN
+                t2_grid[r+1, c] = self.UP
 
         # Shuffle T2
-        for _ in range(iterations):
-            r = random.randint(0, self.N - 2)
-            c = random.randint(0, self.N - 2)
-            self.shuffle_window(t2_grid, r, c)
+        self.shuffle_tiling(t2_grid, shuffle)
 
-        t2_adj = self.grid_to_adj(t2_grid)
+        t2 = self.grid_to_adj(t2_grid)
 
         # 3. Build Overlay Graph
-        graph = {}
-        for r in range(self.N):
-            for c in range(self.N):
-                u = (r,c)
-                v1 = t1_adj[u]
-                v2 = t2_adj[u]
-                graph[u] = [v1, v2]
-
-        # 4. Union-Find Initialization
-        parent = {}
-        for r in range(self.N):
-            for c in range(self.N):
-                parent[(r,c)] = (r,c)
-
-        def find(i):
-            if parent[i] == i:
-                return i
-            parent[i] = find(parent[i])
-            return parent[i]
-
-        def union(i, j):
-            root_i = find(i)
-            root_j = find(j)
-            if root_i != root_j:
-                parent[root_i] = root_j
-                return True
-            return False
-
-        # 5. Identify Initial Cycles
-        visited = set()
-        num_cycles = 0
-
-        # Use a list to iterate deterministically or just loops
-        for r in range(self.N):
-            for c in range(self.N):
-                start_node = (r,c)
-                if start_node not in visited:
-                    num_cycles += 1
-                    curr = start_node
-                    while curr not in visited:
-                        visited.add(curr)
-                        union(start_node, curr)
-
-                        # Move to next
-                        neighbors = graph[curr]
-                        # We need to traverse edges. Since 'visited' tracks nodes,
-                        # we just need to find the neighbor we haven't just come from.
-                        # But here we are just establishing connectivity.
-                        # Traversing by simple graph search (BFS/DFS) is enough to union them.
-                        for nb in neighbors:
-                             if nb not in visited:
-                                 # This logic is slightly flawed for cycle traversal if we want to follow lines,
-                                 # but for Connected Components (Union-Find), we just need to visit everything reachable.
-                                 pass
-
-                        # Wait, simple DFS/BFS to find component is better.
-                        break # Let the DFS below handle it
-
-        # Reset and do proper component finding
-        parent = {}
-        for r in range(self.N):
-            for c in range(self.N):
-                parent[(r,c)] = (r,c)
-
-        visited = set()
-        num_cycles = 0
-        for r in range(self.N):
-            for c in range(self.N):
-                node = (r,c)
-                if node not in visited:
-                    num_cycles += 1
-                    # BFS to find all nodes in this cycle/component
-                    q = [node]
-                    visited.add(node)
-                    while q:
-                        curr = q.pop(0)
-                        union(node, curr)
-                        for nb in graph[curr]:
-                            if nb not in visited:
-                                visited.add(nb)
-                                q.append(nb)
+        # Nodes are cell ids r * N + c, graph[u] = [T1 partner, T2 partner]
+        graph = [[v1, v2] for v1, v2 in zip(t1.tolist(), t2.tolist())]
+
+        # 4. Identify Cycles
+        # Every node has one edge of each tiling, so the cycles can be labeled
+        # by vectorized pointer jumping on the two partner arrays
+        labels = label_matching_cycles(t1, t2)
+        return graph, labels
+
+    def label_cycles(self, graph):
+        # Relabel after repairs, when the edges no longer alternate between
+        # the two tilings: plain union-find over all edges
+        uf = UnionFind(len(graph))
+        for u, (v1, v2) in enumerate(graph):
+            uf.union(u, v1)
+            uf.union(u, v2)
+        return uf
+
+    def is_candidate(self, graph, r, c, type):
+        # A move is valid if:
+        # 1. It forms a 2x2 loop of edges (parallel edges)
+        # 2. The edges connect two DIFFERENT components
+        u = r * self.N + c # Top-Left
+        v1 = u + 1 # Top-Right
+        v2 = u + self.N # Bottom-Left
+        v3 = v2 + 1 # Bottom-Right
+
+        # Note: We must check if these edges actually exist in the current graph
+        find = self.uf.find
+        if type == 'H':
+            # Horizontal Parallel Edges (u-v1) and (v2-v3)
+            return v1 in graph[u] and v3 in graph[v2] and find(u) != find(v2)
+        # Vertical Parallel Edges (u-v2) and (v1-v3)
+        return v2 in graph[u] and v3 in graph[v1] and find(u) != find(v1)
+
+    def merge_candidates(self, graph):
+        # Index of merge candidates, built with one scan of all 2x2 windows.
+        # A swap only changes edges inside its own 2x2 block, so afterwards only
+        # the windows overlapping that block are re-checked. Windows that became
+        # invalid because their two components were joined elsewhere are dropped
+        # lazily when they are drawn, so each merge costs O(1) amortized and the
+        # pick is still uniform over the valid candidates.
+        candidates = CandidateSet()
+        for r in range(self.N - 1):
+            for c in range(self.N - 1):
+                for type in ('H', 'V'):
+                    if self.is_candidate(graph, r, c, type):
+                        candidates.add((r, c, type))
+        return candidates
+
+    def merge_cycles(self, graph, labels, max_repairs):
+        # 5. Union-Find Initialization
+        # Every node starts linked to its cycle's label
+        self.uf = UnionFind.from_labels(labels)
+        num_cycles = len(self.uf.roots())
 
         # 6. Merge Cycles
         # Repeat until 1 cycle remains
         print(f"Initial cycles: {num_cycles}")
 
+        candidates = self.merge_candidates(graph)
+        repairs = 0
         while num_cycles > 1:
-            candidates = []
-
-            # Scan all 2x2 windows for valid merge moves
-            # A move is valid if:
-            # 1. It forms a 2x2 loop of edges (parallel edges)
-            # 2. The edges connect two DIFFERENT components
-
-            for r in range(self.N - 1):
-                for c in range(self.N - 1):
-                    u = (r, c) # Top-Left
-                    v1 = (r, c+1) # Top-Right
-                    v2 = (r+1, c) # Bottom-Left
-                    v3 = (r+1, c+1) # Bottom-Right
-
-                    root_u = find(u)
-
-                    # Check Horizontal Parallel Edges
-                    # (u-v1) and (v2-v3)
-                    # Note: We must check if these edges actually exist in the current graph
-                    if v1 in graph[u] and v3 in graph[v2]:
-                        root_v2 = find(v2)
-                        if root_u != root_v2:
-                            candidates.append(((r,c), 'H'))
-
-                    # Check Vertical Parallel Edges
-                    # (u-v2) and (v1-v3)
-                    if v2 in graph[u] and v3 in graph[v1]:
-                        root_v1 = find(v1)
-                        if root_u != root_v1:
-                            candidates.append(((r,c), 'V'))
-
-            if not candidates:
-                print("No valid merges found (Deadlock). Restarting...")
-                return self.solve()
-
             # Randomly pick a merge
-            (r, c), type = random.choice(candidates)
-
-            u = (r, c)
-            v1 = (r, c+1)
-            v2 = (r+1, c)
-            v3 = (r+1, c+1)
-
-            if type == 'H':
-                # Swap Horizontal edges to Vertical
-                # Remove (u, v1) and (v2, v3)
-                self.remove_edge(graph, u, v1)
-                self.remove_edge(graph, v2, v3)
-                # Add (u, v2) and (v1, v3)
-                self.add_edge(graph, u, v2)
-                self.add_edge(graph, v1, v3)
-                # Union sets
-                union(u, v2)
-            else:
-                # Swap Vertical edges to Horizontal
-                # Remove (u, v2) and (v1, v3)
-                self.remove_edge(graph, u, v2)
-                self.remove_edge(graph, v1, v3)
-                # Add (u, v1) and (v2, v3)
-                self.add_edge(graph, u, v1)
-                self.add_edge(graph, v2, v3)
-                # Union sets
-                union(u, v1)
-
+            move = None
+            while candidates:
+                key = candidates.pick(self.rng)
+                if self.is_candidate(graph, *key):
+                    move = key
+                    break
+                candidates.discard(key)
+
+            if move is None:
+                if repairs == max_repairs:
+                    return False
+                repairs += 1
+                self.stats['repairs'] += 1
+                print("No valid merges found (Deadlock). Repairing locally...")
+
+                # Re-shuffle around every stuck cycle except the largest one.
+                # These are typically 2-cycles (a domino shared by both
+                # tilings) with no parallel edge of another cycle next to them.
+                # The neighborhood grows slowly while repairs keep failing to
+                # unlock a merge.
+                members = {}
+                for u in range(len(graph)):
+                    members.setdefault(self.uf.find(u), []).append(u)
+                largest = max(members, key=lambda root: len(members[root]))
+                for root, nodes in members.items():
+                    if root != largest:
+                        self.repair(graph, nodes[0], 2 + repairs // 4)
+
+                self.uf = self.label_cycles(graph)
+                num_cycles = len(self.uf.roots())
+                candidates = self.merge_candidates(graph)
+                continue
+
+            r, c, type = move
+            self.swap_window(graph, r, c, type)
+            self.stats['merges'] += 1
             num_cycles -= 1
+            # Progress again: max_repairs and the repair radius count failed
+            # repairs in a row, the run total is only kept in stats
+            repairs = 0
+
+            # Re-check the windows sharing cells with the swapped block
+            for rr in range(max(r - 1, 0), min(r + 2, self.N - 1)):
+                for cc in range(max(c - 1, 0), min(c + 2, self.N - 1)):
+                    for t in ('H', 'V'):
+                        if self.is_candidate(graph, rr, cc, t):
+                            candidates.add((rr, cc, t))
+                        else:
+                            candidates.discard((rr, cc, t))
+
             if num_cycles % 10 == 0:
                 print(f"Cycles remaining: {num_cycles}")
-
-        # 7. Convert Graph to Grid Directions
-        self.graph_to_grid(graph)
         return True
 
+    def swap_window(self, graph, r, c, type):
+        u = r * self.N + c
+        v1 = u + 1
+        v2 = u + self.N
+        v3 = v2 + 1
+
+        if type == 'H':
+            # Swap Horizontal edges to Vertical
+            # Remove (u, v1) and (v2, v3)
+            self.remove_edge(graph, u, v1)
+            self.remove_edge(graph, v2, v3)
+            # Add (u, v2) and (v1, v3)
+            self.add_edge(graph, u, v2)
+            self.add_edge(graph, v1, v3)
+            # Union sets
+            self.uf.union(u, v2)
+        else:
+            # Swap Vertical edges to Horizontal
+            # Remove (u, v2) and (v1, v3)
+            self.remove_edge(graph, u, v2)
+            self.remove_edge(graph, v1, v3)
+            # Add (u, v1) and (v2, v3)
+            self.add_edge(graph, u, v1)
+            self.add_edge(graph, v2, v3)
+            # Union sets
+            self.uf.union(u, v1)
+
+    def repair(self, graph, center, radius):
+        # Local repair of a stuck overlay: inside a (2*radius)^2 neighborhood
+        # of `center`, every 2x2 window holding two parallel edges is swapped
+        # with probability 1/2. In a deadlock all such pairs belong to the same
+        # cycle; swapping them keeps every node at degree 2 and either splits
+        # that cycle or reroutes it, which opens up new merge moves. The
+        # components are relabeled afterwards, so union() here is not needed.
+        r0, c0 = divmod(center, self.N)
+        rows = range(max(r0 - radius, 0), min(r0 + radius, self.N - 1))
+        cols = range(max(c0 - radius, 0), min(c0 + radius, self.N - 1))
+        for r in rows:
+            for c in cols:
+                u = r * self.N + c
+                v1 = u + 1
+                v2 = u + self.N
+                v3 = v2 + 1
+                if v1 in graph[u] and v3 in graph[v2]:
+                    type = 'H'
+                elif v2 in graph[u] and v3 in graph[v1]:
+                    type = 'V'
+                else:
+                    continue
+                if self.rng.random() < 0.5:
+                    self.swap_window(graph, r, c, type)
+
+    def shuffle_tiling(self, grid, shuffle):
+        if shuffle == 'sweep':
+            # Each window is considered 10 times with flip probability 1/2,
+            # about as many flips as N*N*5 random window attempts
+            self.sweep_shuffle(grid, 10)
+            return
+
+        # Window corners come from a pre-drawn stream of ints in [0, N-2]
+        pick = IntStream(self.rng, self.N - 1)
+        iterations = self.N * self.N * 5
+        for _ in range(iterations):
+            r = pick()
+            c = pick()
+            self.shuffle_window(grid, r, c)
+
+    def sweep_shuffle(self, grid, sweeps):
+        # Windows whose top-left corners have the same (row % 2, col % 2)
+        # never overlap, so all windows of one such sublattice can be flipped
+        # at once. Every eligible window (two parallel dominoes) of the
+        # sublattice is rotated with probability 1/2, then the next sublattice
+        # is processed; one sweep visits all four.
+        g = grid.view()
+        N = self.N
+        for _ in range(sweeps):
+            for a, b in ((0, 0), (1, 1), (0, 1), (1, 0)):
+                # Window corners (a + 2i, b + 2j) with a + 2i <= N-2
+                rows = slice(a, N - 1, 2)
+                cols = slice(b, N - 1, 2)
+                rows1 = slice(a + 1, N, 2)
+                cols1 = slice(b + 1, N, 2)
+                tl = g[rows, cols]
+                tr = g[rows, cols1]
+                bl = g[rows1, cols]
+                br = g[rows1, cols1]
+
+                horizontal = ((tl == self.RIGHT) & (tr == self.LEFT) &
+                              (bl == self.RIGHT) & (br == self.LEFT))
+                vertical = ((tl == self.DOWN) & (bl == self.UP) &
+                            (tr == self.DOWN) & (br == self.UP))
+                flip = self.rng.random(tl.shape) < 0.5
+                h = horizontal & flip
+                v = vertical & flip
+
+                # tl/tr/bl/br are strided views, so these write into the grid
+                tl[h] = self.DOWN; bl[h] = self.UP
+                tr[h] = self.DOWN; br[h] = self.UP
+                tl[v] = self.RIGHT; tr[v] = self.LEFT
+                bl[v] = self.RIGHT; br[v] = self.LEFT
+
     def shuffle_window(self, grid, r, c):
         # 2x2 rotation logic
-        if (grid[r][c] == self.RIGHT and grid[r][c+1] == self.LEFT and
-            grid[r+1][c] == self.RIGHT and grid[r+1][c+1] == self.LEFT):
-            grid[r][c] = self.DOWN; grid[r+1][c] = self.UP
-            grid[r][c+1] = self.DOWN; grid[r+1][c+1] = self.UP
-        elif (grid[r][c] == self.DOWN and grid[r+1][c] == self.UP and
-              grid[r][c+1] == self.DOWN and grid[r+1][c+1] == self.UP):
-            grid[r][c] = self.RIGHT; grid[r][c+1] = self.LEFT
-            grid[r+1][c] = self.RIGHT; grid[r+1][c+1] = self.LEFT
+        if (grid[r, c] == self.RIGHT and grid[r, c+1] == self.LEFT and
+            grid[r+1, c] == self.RIGHT and grid[r+1, c+1] == self.LEFT):
+            grid[r, c] = self.DOWN; grid[r+1, c] = self.UP
+            grid[r, c+1] = self.DOWN; grid[r+1, c+1] = self.UP
+        elif (grid[r, c] == self.DOWN and grid[r+1, c] == self.UP and
+              grid[r, c+1] == self.DOWN and grid[r+1, c+1] == self.UP):
+            grid[r, c] = self.RIGHT; grid[r, c+1] = self.LEFT
+            grid[r+1, c] = self.RIGHT; grid[r+1, c+1] = self.LEFT
 
     def grid_to_adj(self, grid):
-        adj = {}
-        for r in range(self.N):
-            for c in range(self.N):
-                d = grid[r][c]
-                nr, nc = r, c
-                if d == self.LEFT: nc -= 1
-                elif d == self.RIGHT: nc += 1
-                elif d == self.UP: nr -= 1
-                elif d == self.DOWN: nr += 1
-                adj[(r,c)] = (nr, nc)
-        return adj
+        # Partner array of a tiling: adj[u] = id of the cell u's domino points to
+        return successors(grid.view())
 
     def remove_edge(self, graph, u, v):
         if v in graph[u]: graph[u].remove(v)
@@ -244,113 +342,36 @@ class HamiltonianCycleDomino:
         graph[v].append(u)
 
     def graph_to_grid(self, graph):
-        # Pick start node
-        start = (0,0)
-        visited = set()
-        curr = start
-        prev = graph[start][0] # Arbitrary prev
-
         # Traverse Hamiltonian Cycle
         # Note: 'graph' is adjacency list. Each node has degree 2.
-        # We need to trace the path and assign directions.
-
-        # Find the neighbor that is NOT prev to determine direction
-        # Special case for start: just pick one neighbor as 'next', the other becomes 'prev' effectively
-
-        # Actually, let's just trace.
+        # Trace the node order from (0,0), then assign all directions at once.
         path = []
-        curr = start
-        # Find valid initial next
-        nbs = graph[curr]
-        next_node = nbs[0]
-
-        # Traverse
-        while len(path) < self.N * self.N:
+        prev = graph[0][1] # Arbitrary prev
+        curr = 0
+        for _ in range(self.N * self.N):
             path.append(curr)
-            visited.add(curr)
-
-            # Determine direction to next_node
-            r, c = curr
-            nr, nc = next_node
-
-            if nr == r and nc == c - 1: self.grid[r][c] = self.LEFT
-            elif nr == r and nc == c + 1: self.grid[r][c] = self.RIGHT
-            elif nr == r - 1 and nc == c: self.grid[r][c] = self.UP
-            elif nr == r + 1 and nc == c: self.grid[r][c] = self.DOWN
-
-            # Move
-            prev = curr
-            curr = next_node
-
-            # Find new next
             nbs = graph[curr]
-            if nbs[0] == prev:
-                next_node = nbs[1]
-            else:
-                next_node = nbs[0]
+            prev, curr = curr, (nbs[1] if nbs[0] == prev else nbs[0])
+
+        # Direction from the id difference to the next node
+        path = np.array(path, dtype=np.int64)
+        step = np.roll(path, -1) - path
+        dirs = np.select([step == -1, step == 1, step == -self.N, step == self.N],
+                         [self.LEFT, self.RIGHT, self.UP, self.DOWN])
+        self.grid.view().ravel()[path] = dirs
 
     def print_grid(self):
         for y in range(self.N):
             row_str = []
             for x in range(self.N):
-                row_str.append(str(self.grid[y][x]))
+                row_str.append(str(self.grid[y, x]))
             print(",".join(row_str) + ",")
         print("\n----------\n")
 
-    def generate_html(self, filename="HamiltonianCycleDomino.html"):
-        available_size = SVG_SIZE - 2 * MARGIN
-        cell_size = available_size / self.N
-
-        width = SVG_SIZE
-        height = SVG_SIZE
-
-        svg_content = [f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">']
-
-        # Draw Path
-        for y in range(self.N):
-            for x in range(self.N):
-                direction = self.grid[y][x]
-                if direction == 0: continue
-
-                x1 = MARGIN + x * cell_size + cell_size / 2
-                y1 = MARGIN + y * cell_size + cell_size / 2
-
-                dx, dy = 0, 0
-                if direction == self.LEFT: dx = -1
-                elif direction == self.UP: dy = -1
-                elif direction == self.RIGHT: dx = 1
-                elif direction == self.DOWN: dy = 1
-
-                x2 = x1 + dx * cell_size
-                y2 = y1 + dy * cell_size
-
-                stroke_width = max(1, cell_size * 0.1)
-                svg_content.append(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="#007bff" stroke-width="{stroke_width}" />')
-                radius = max(1, cell_size * 0.1)
-                svg_content.append(f'<circle cx="{x1}" cy="{y1}" r="{radius}" fill="#007bff" />')
-
-        svg_content.append('</svg>')
-
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Hamiltonian Cycle Domino {self.N}x{self.N}</title>
-    <style>
-        body {{ font-family: sans-serif; text-align: center; padding: 0; margin: 0; }}
-        h1 {{ margin: 10px; }}
-        svg {{ border: 1px solid #ccc; background: #f9f9f9; }}
-    </style>
-</head>
-<body>
-    <h1>Hamiltonian Cycle Domino ({self.N}x{self.N})</h1>
-    {"".join(svg_content)}
-</body>
-</html>
-"""
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        print(f"HTML visualization saved to {filename}")
+    def generate_html(self, filename="HamiltonianCycleDomino.html", mode="path", compress=None):
+        # mode "path", "lines" or "canvas", gzip output with compress=True or
+        # a .gz filename (see html_writer.py)
+        write_cycle_html(filename, "Hamiltonian Cycle Domino", self.grid, mode, compress=compress)
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
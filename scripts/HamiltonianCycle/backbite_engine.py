@@ -0,0 +1,460 @@
+import numpy as np
+from rng import IntStream, MOVE_CHOICES
+
+# Path engine shared by the Backbite scripts.
+#
+# Nodes are flat cell ids (r * N + c). The path is stored in a ring buffer
+# `ring` together with its inverse `pos` (node -> ring slot), so finding the
+# position of a node is O(1) instead of a `path.index(node)` scan.
+#
+# Logical path index i lives in ring slot (head + dir * i) % n:
+# - Rotating the path (closing the cycle and breaking it elsewhere) only moves
+#   `head`, nothing is copied.
+# - Reversing a segment swaps ring slots in place. If the segment is longer
+#   than half of the path, the complementary segment is reversed instead and
+#   the reading direction is flipped, which gives the same path. So a
+#   reversal never touches more than n/2 nodes.
+
+class ArrayPath:
+    def __init__(self, nodes, rng=None):
+        self.n = len(nodes)
+        self.ring = list(nodes)
+        self.pos = [0] * self.n
+        for i, u in enumerate(self.ring):
+            self.pos[u] = i
+        self.head = 0
+        self.dir = 1
+
+    def __len__(self):
+        return self.n
+
+    def node_at(self, i):
+        return self.ring[(self.head + self.dir * i) % self.n]
+
+    def index(self, u):
+        return ((self.pos[u] - self.head) * self.dir) % self.n
+
+    def nodes(self):
+        # Path in logical order (head first)
+        h = self.head
+        if self.dir == 1:
+            return self.ring[h:] + self.ring[:h]
+        return self.ring[h::-1] + self.ring[:h:-1]
+
+    def rotate(self, k):
+        # path = path[k:] + path[:k]
+        self.head = (self.head + self.dir * k) % self.n
+
+    def reverse_prefix(self, k):
+        # path = path[:k][::-1] + path[k:]
+        if k <= self.n - k:
+            self._reverse(0, k)
+        else:
+            self._flip_around(k)
+
+    def reverse_suffix(self, k):
+        # path = path[:k] + path[k:][::-1]
+        if self.n - k <= k:
+            self._reverse(k, self.n)
+        else:
+            self._flip_around(k)
+
+    def _flip_around(self, k):
+        # Path is A + B with A = path[:k], B = path[k:].
+        # Reversing the prefix gives rev(A) + B, reversing the suffix gives
+        # A + rev(B). As rings both are the same sequence read backwards from
+        # the other one, so only the shorter part is reversed in place:
+        #   reverse B in place -> ring holds A + rev(B); reading it backwards
+        #   from logical k-1 gives rev(A) + B.
+        #   reverse A in place -> ring holds rev(A) + B; reading it backwards
+        #   from logical k-1 gives A + rev(B).
+        if k <= self.n - k:
+            self._reverse(0, k)
+        else:
+            self._reverse(k, self.n)
+        self.head = (self.head + self.dir * (k - 1)) % self.n
+        self.dir = -self.dir
+
+    def _reverse(self, a, b):
+        # Reverse logical range [a, b) in place, keeping `pos` in sync
+        n, d = self.n, self.dir
+        ring, pos = self.ring, self.pos
+        i = (self.head + d * a) % n
+        j = (self.head + d * (b - 1)) % n
+        for _ in range((b - a) // 2):
+            u = ring[i]
+            v = ring[j]
+            ring[i] = v
+            pos[v] = i
+            ring[j] = u
+            pos[u] = j
+            i = (i + d) % n
+            j = (j - d) % n
+
+
+# Alternative path backend: implicit treap (key = position in the path) with
+# lazy reverse flags. Every operation the chain needs is a split/merge or a
+# walk along one root-to-node path, so all of them are O(log n) expected,
+# independent of the length of the reversed segment.
+#
+# Tree nodes are the path nodes themselves, stored in flat lists indexed by
+# node id. Slot n is a shared empty node (NIL) with size 0.
+
+class TreapPath:
+    def __init__(self, nodes, rng=None):
+        n = self.n = len(nodes)
+        NIL = self.NIL = n
+        self.left = [NIL] * (n + 1)
+        self.right = [NIL] * (n + 1)
+        self.parent = [NIL] * (n + 1)
+        self.size = [1] * n + [0]
+        self.rev = [False] * (n + 1)
+        self.prio = np.random.default_rng(rng).random(n).tolist() + [-1.0]
+
+        # Build the Cartesian tree of the sequence in O(n) with a stack of the
+        # current right spine (max-heap on priorities)
+        left, right, parent, prio = self.left, self.right, self.parent, self.prio
+        spine = []
+        for u in nodes:
+            last = NIL
+            while spine and prio[spine[-1]] < prio[u]:
+                last = spine.pop()
+            left[u] = last
+            if last != NIL:
+                parent[last] = u
+            if spine:
+                right[spine[-1]] = u
+                parent[u] = spine[-1]
+            spine.append(u)
+        self.root = spine[0] if spine else NIL
+        self.parent[self.root] = NIL
+
+        # Sizes bottom-up (post-order)
+        order = []
+        stack = [self.root] if n else []
+        while stack:
+            t = stack.pop()
+            order.append(t)
+            if left[t] != NIL: stack.append(left[t])
+            if right[t] != NIL: stack.append(right[t])
+        size = self.size
+        for t in reversed(order):
+            size[t] = 1 + size[left[t]] + size[right[t]]
+
+    def __len__(self):
+        return self.n
+
+    def _push(self, t):
+        # Apply a pending reversal of the subtree at t to its children
+        if self.rev[t]:
+            l = self.left[t]
+            self.left[t] = self.right[t]
+            self.right[t] = l
+            self.rev[self.left[t]] ^= True
+            self.rev[self.right[t]] ^= True
+            self.rev[t] = False
+
+    def _split(self, t, k):
+        # Split subtree t into (first k nodes, rest)
+        NIL = self.NIL
+        if t == NIL:
+            return NIL, NIL
+        self._push(t)
+        left, right, size = self.left, self.right, self.size
+        if k <= size[left[t]]:
+            a, b = self._split(left[t], k)
+            left[t] = b
+            self.parent[b] = t
+            size[t] = 1 + size[b] + size[right[t]]
+            return a, t
+        a, b = self._split(right[t], k - size[left[t]] - 1)
+        right[t] = a
+        self.parent[a] = t
+        size[t] = 1 + size[left[t]] + size[a]
+        return t, b
+
+    def _merge(self, a, b):
+        NIL = self.NIL
+        if a == NIL:
+            return b
+        if b == NIL:
+            return a
+        left, right, size = self.left, self.right, self.size
+        if self.prio[a] > self.prio[b]:
+            self._push(a)
+            right[a] = self._merge(right[a], b)
+            self.parent[right[a]] = a
+            size[a] = 1 + size[left[a]] + size[right[a]]
+            return a
+        self._push(b)
+        left[b] = self._merge(a, left[b])
+        self.parent[left[b]] = b
+        size[b] = 1 + size[left[b]] + size[right[b]]
+        return b
+
+    def _join(self, a, b):
+        self.root = self._merge(a, b)
+        self.parent[self.root] = self.NIL
+
+    def node_at(self, i):
+        left, size = self.left, self.size
+        t = self.root
+        while True:
+            self._push(t)
+            sl = size[left[t]]
+            if i < sl:
+                t = left[t]
+            elif i == sl:
+                return t
+            else:
+                i -= sl + 1
+                t = self.right[t]
+
+    def index(self, u):
+        # Clear the reverse flags on the root -> u path first, then count the
+        # nodes left of u on the way back up
+        NIL, parent = self.NIL, self.parent
+        ancestors = []
+        t = u
+        while t != NIL:
+            ancestors.append(t)
+            t = parent[t]
+        for t in reversed(ancestors):
+            self._push(t)
+
+        left, size = self.left, self.size
+        i = size[left[u]]
+        t = u
+        p = parent[t]
+        while p != NIL:
+            if self.right[p] == t:
+                i += size[left[p]] + 1
+            t = p
+            p = parent[t]
+        return i
+
+    def nodes(self):
+        # In-order traversal
+        NIL = self.NIL
+        out = []
+        stack = []
+        t = self.root
+        while stack or t != NIL:
+            while t != NIL:
+                self._push(t)
+                stack.append(t)
+                t = self.left[t]
+            t = stack.pop()
+            out.append(t)
+            t = self.right[t]
+        return out
+
+    def rotate(self, k):
+        # path = path[k:] + path[:k]
+        a, b = self._split(self.root, k)
+        self._join(b, a)
+
+    def reverse_prefix(self, k):
+        # path = path[:k][::-1] + path[k:]
+        a, b = self._split(self.root, k)
+        self.rev[a] ^= True
+        self._join(a, b)
+
+    def reverse_suffix(self, k):
+        # path = path[:k] + path[k:][::-1]
+        a, b = self._split(self.root, k)
+        self.rev[b] ^= True
+        self._join(a, b)
+
+BACKENDS = {
+    'array': ArrayPath,
+    'treap': TreapPath,
+}
+
+class BackbiteChain:
+    def __init__(self, N, nodes, path_cls=ArrayPath, rng=None):
+        self.N = N
+        self.rng = np.random.default_rng(rng)
+        self.path = path_cls(nodes, self.rng)
+        # One pre-drawn value per move picks both the end and the neighbor
+        self.draw = IntStream(self.rng, MOVE_CHOICES)
+
+        # Grid neighbors of every node
+        self.nbs = []
+        for r in range(N):
+            for c in range(N):
+                nbs = []
+                for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
+                    nr, nc = r+dr, c+dc
+                    if 0 <= nr < N and 0 <= nc < N:
+                        nbs.append(nr * N + nc)
+                self.nbs.append(nbs)
+
+        self.observe = False
+
+    def track_observables(self):
+        # Cheap observables of the current path, kept up to date in O(1) per
+        # changed edge while the chain runs:
+        # - horizontal: number of horizontal path edges
+        # - turns: number of nodes where the path changes direction
+        #   (the number of straight runs is always turns + 1)
+        n = len(self.path)
+        self.deg = [0] * n
+        self.hdeg = [0] * n
+        self.horizontal = 0
+        self.turns = 0
+        nodes = self.path.nodes()
+        for u, v in zip(nodes, nodes[1:]):
+            self._edge_changed(u, v, 1)
+        self.observe = True
+
+    def _edge_changed(self, u, v, sign):
+        # Path edges always join grid neighbors, so ids one apart are a
+        # horizontal edge and ids N apart a vertical one
+        horizontal = abs(u - v) == 1
+        deg, hdeg = self.deg, self.hdeg
+        for w in (u, v):
+            self.turns -= deg[w] == 2 and hdeg[w] == 1
+            deg[w] += sign
+            if horizontal:
+                hdeg[w] += sign
+            self.turns += deg[w] == 2 and hdeg[w] == 1
+        if horizontal:
+            self.horizontal += sign
+
+    def step(self):
+        # One Backbite move on the path (see HamiltonianCycleBackbite.solve)
+        path = self.path
+        n = len(path)
+        head = path.node_at(0)
+        tail = path.node_at(n - 1)
+
+        v = self.draw()
+        at_head = v & 1
+        if at_head:
+            active_end, other_end = head, tail
+        else:
+            active_end, other_end = tail, head
+
+        nbs = self.nbs[active_end]
+        target = nbs[(v >> 1) % len(nbs)]
+
+        # Case 1: Target is the other endpoint -> the path closes into a cycle.
+        # Break it again at a random edge by rotating the ring.
+        if target == other_end:
+            cut = int(self.rng.integers(0, n - 1))
+            if self.observe:
+                self._edge_changed(head, tail, 1)
+                self._edge_changed(path.node_at(cut), path.node_at(cut + 1), -1)
+            path.rotate(cut + 1)
+            return
+
+        k = path.index(target)
+
+        # Case 2: Target is adjacent in path (already connected)
+        if (at_head and k == 1) or (not at_head and k == n - 2):
+            return
+
+        # Case 3: Reversal move
+        self._bite(at_head, k)
+
+    def _bite(self, at_head, k):
+        # Connect the active end to the node at index k and drop the path edge
+        # on the end's side of it
+        path = self.path
+        target = path.node_at(k)
+        if at_head:
+            # v0 ... vk-1, vk ... vn -> vk-1 ... v0, vk ... vn
+            if self.observe:
+                self._edge_changed(path.node_at(0), target, 1)
+                self._edge_changed(path.node_at(k - 1), target, -1)
+            path.reverse_prefix(k)
+        else:
+            # v0 ... vk, vk+1 ... vn -> v0 ... vk, vn ... vk+1
+            if self.observe:
+                self._edge_changed(path.node_at(len(path) - 1), target, 1)
+                self._edge_changed(target, path.node_at(k + 1), -1)
+            path.reverse_suffix(k + 1)
+
+    def close(self, max_steps=None, steer=False):
+        # Keep running the chain until the two ends are grid neighbors.
+        # Every step first looks at the (at most 6) bites available from both
+        # ends. The new end a bite creates is known up front (v_k-1 at the
+        # head, v_k+1 at the tail), so each candidate costs O(1) lookups. If
+        # some of them leave the ends adjacent, one of those is taken at
+        # random; otherwise the chain makes a normal random move. The ends
+        # then wander like two random walks that have to meet (~n log n moves).
+        # steer=True (opt-in) also takes a random one of the bites that bring
+        # the ends closer when no closing bite exists. That closes in O(N)
+        # moves, but those moves are not chain moves and bias the region
+        # around the final ends.
+        # Stops after max_steps moves if given. Returns the number of moves made.
+        steps = 0
+        while not self.is_closed():
+            if max_steps is not None and steps >= max_steps:
+                break
+            if not self._closing_move(steer):
+                self.step()
+            steps += 1
+        return steps
+
+    def _closing_move(self, steer=False):
+        path, N = self.path, self.N
+        n = len(path)
+        head = path.node_at(0)
+        tail = path.node_at(n - 1)
+        hr, hc = divmod(head, N)
+        tr, tc = divmod(tail, N)
+        dist = abs(hr - tr) + abs(hc - tc)
+        closing = []
+        closer = []
+        for at_head, end, (r, c) in ((True, head, (tr, tc)), (False, tail, (hr, hc))):
+            for w in self.nbs[end]:
+                k = path.index(w)
+                if at_head:
+                    if k == 1:
+                        continue
+                    new_end = path.node_at(k - 1)
+                else:
+                    if k == n - 2:
+                        continue
+                    new_end = path.node_at(k + 1)
+                er, ec = divmod(new_end, N)
+                d = abs(er - r) + abs(ec - c)
+                if d == 1:
+                    closing.append((at_head, k))
+                elif d < dist:
+                    closer.append((at_head, k))
+        moves = closing or (closer if steer else None)
+        if not moves:
+            return False
+        self._bite(*moves[int(self.rng.integers(len(moves)))])
+        return True
+
+    def close_bounded(self, max_steps=None):
+        # close() with a hard bound: at most max_steps chain moves, then at most
+        # limit steered ones, where limit = 20 n log n is far beyond the usual
+        # meeting time (and the default max_steps). Raises RuntimeError if the
+        # ends still have not met. Returns (chain moves, steered moves);
+        # steered > 0 means the result carries the steering bias described in
+        # close().
+        n = len(self.path)
+        limit = 20 * n * max(1, int(np.log(n)))
+        steps = self.close(limit if max_steps is None else max_steps)
+        steered = 0
+        if not self.is_closed():
+            steered = self.close(limit, steer=True)
+        if not self.is_closed():
+            raise RuntimeError(f"Path ends did not meet within {steps + steered} closing moves")
+        return steps, steered
+
+    def is_closed(self):
+        n = len(self.path)
+        hr, hc = divmod(self.path.node_at(0), self.N)
+        tr, tc = divmod(self.path.node_at(n - 1), self.N)
+        return abs(hr - tr) + abs(hc - tc) == 1
+
+    def cells(self):
+        # Path as a list of (r, c) coordinates
+        N = self.N
+        return [divmod(u, N) for u in self.path.nodes()]
@@ -0,0 +1,99 @@
+import os
+import argparse
+import contextlib
+from multiprocessing import Pool
+
+import numpy as np
+from config import N
+
+from HamiltonianCycleBackbite import HamiltonianCycleBackbite
+from HamiltonianCycleDomino import HamiltonianCycleDomino
+from HamiltonianCycleRecursive import RecursiveHamiltonianCycle
+from HamiltonianCycleSpanningTree import HamiltonianCycleConstructive
+from HamiltonianCycleWilson import HamiltonianCycleWilson
+from validate import validate_cycle
+from cycle_format import CODECS, CycleWriter
+
+# Batch generation of many cycles at once.
+# Every cycle is an independent task on a process pool. Each task gets its own
+# child of one SeedSequence, so a run is reproducible for a given seed and the
+# worker streams are statistically independent regardless of the job count.
+# All grids end up in one stacked (count, N, N) uint8 array / .npy file, and
+# each one is checked to be a single Hamiltonian cycle (validate.py) first.
+# An output name ending in .hcyc writes a packed archive instead
+# (cycle_format.py), with "entropy:i" as the seed of the i-th cycle, the
+# entropy of the run's root SeedSequence (the --seed value when given).
+
+ALGORITHMS = {
+    'backbite': HamiltonianCycleBackbite,
+    'domino': HamiltonianCycleDomino,
+    'recursive': RecursiveHamiltonianCycle,
+    'spanningtree': HamiltonianCycleConstructive,
+    'wilson': HamiltonianCycleWilson,
+}
+
+def _generate_one(task):
+    algorithm, N, seed_seq, validate = task
+
+    # Solvers report progress with print(), keep the workers quiet
+    with contextlib.redirect_stdout(None):
+        solver = ALGORITHMS[algorithm](N, seed=seed_seq)
+        solver.solve()
+    if validate:
+        validate_cycle(solver.grid)
+    return bytes(solver.grid.data)
+
+def generate_many(algorithm, N, count, jobs=None, seed=None, out=None, validate=True):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {sorted(ALGORITHMS)}")
+
+    if out is not None:
+        grids = np.lib.format.open_memmap(out, mode='w+', dtype=np.uint8, shape=(count, N, N))
+    else:
+        grids = np.zeros((count, N, N), dtype=np.uint8)
+
+    # seed: an int, None (fresh entropy) or a SeedSequence to spawn from
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(count)
+    tasks = [(algorithm, N, s, validate) for s in seeds]
+
+    with contextlib.ExitStack() as stack:
+        if jobs == 1:
+            results = map(_generate_one, tasks)
+        else:
+            pool = stack.enter_context(Pool(jobs))
+            # imap keeps the output order (and thus the seed -> slot mapping) fixed
+            chunksize = max(1, count // (4 * (jobs or os.cpu_count() or 1)))
+            results = pool.imap(_generate_one, tasks, chunksize=chunksize)
+
+        for i, data in enumerate(results):
+            grids[i] = np.frombuffer(data, dtype=np.uint8).reshape(N, N)
+
+    if out is not None:
+        grids.flush()
+    return grids
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate many Hamiltonian cycles in parallel")
+    parser.add_argument("algorithm", choices=sorted(ALGORITHMS))
+    parser.add_argument("N", type=int, nargs="?", default=N)
+    parser.add_argument("count", type=int, nargs="?", default=1)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("-o", "--out", default="HamiltonianCycles.npy", help="stacked (count, N, N) uint8 .npy file")
+    parser.add_argument("--codec", choices=sorted(CODECS), default="none", help="compression of .hcyc output")
+    parser.add_argument("--no-validate", dest="validate", action="store_false", help="skip the single-cycle check of every grid")
+    args = parser.parse_args()
+
+    # Root of the run, its entropy (drawn from the OS without --seed)
+    # reproduces every cycle: -s <entropy> gives the same children again
+    root = np.random.SeedSequence(args.seed)
+    if args.out.endswith(".hcyc"):
+        grids = generate_many(args.algorithm, args.N, args.count, jobs=args.jobs, seed=root, validate=args.validate)
+        with CycleWriter(args.out, args.codec) as writer:
+            for i, grid in enumerate(grids):
+                writer.write(grid, args.algorithm, f"{root.entropy}:{i}")
+    else:
+        generate_many(args.algorithm, args.N, args.count, jobs=args.jobs, seed=root, out=args.out, validate=args.validate)
+    print(f"{args.count} cycles ({args.N}x{args.N}, {args.algorithm}) saved to {args.out}")
@@ -0,0 +1,90 @@
+import base64
+from config import SVG_SIZE, MARGIN
+from cycle_format import pack_grid
+
+# HTML export drawing the cycle on a <canvas>.
+#
+# The page embeds the grid itself, 2 bits per cell (the .hcyc packing, see
+# cycle_format.py) as base64, about N*N/3 bytes of text. A small renderer
+# decodes it into a typed array and draws it:
+# - large cells: the cycle is walked once and every straight run is one
+#   segment of a single Path2D, plus one Path2D with all the dots
+# - small cells: one pixel per cell and one per edge into ImageData of size
+#   2N x 2N, scaled to the canvas by CSS
+# so even N=2048 opens instantly. The page itself is written by
+# html_writer.py.
+
+RENDERER_JS = """
+function drawCycle(canvas, N, packed, size, margin, color) {
+    const bytes = Uint8Array.from(atob(packed), ch => ch.charCodeAt(0));
+    // 1: Left, 2: Up, 3: Right, 4: Down
+    const grid = new Uint8Array(N * N);
+    for (let i = 0; i < N * N; i++) grid[i] = ((bytes[i >> 2] >> ((i & 3) * 2)) & 3) + 1;
+    const offset = [0, -1, -N, 1, N];
+    const cell = (size - 2 * margin) / N;
+
+    if (cell < 4) {
+        // Cell (r, c) at pixel (2r, 2c), its edge on the pixel next to it
+        canvas.width = canvas.height = 2 * N;
+        canvas.style.width = canvas.style.height = (size - 2 * margin) + "px";
+        canvas.style.padding = margin + "px";
+        canvas.style.imageRendering = cell >= 1 ? "pixelated" : "auto";
+        const ctx = canvas.getContext("2d");
+        const image = ctx.createImageData(2 * N, 2 * N);
+        const px = new Uint32Array(image.data.buffer);
+        const r = parseInt(color.slice(1, 3), 16), g = parseInt(color.slice(3, 5), 16), b = parseInt(color.slice(5, 7), 16);
+        const ink = (0xff << 24 | b << 16 | g << 8 | r) >>> 0;
+        const dr = [0, 0, -1, 0, 1], dc = [0, -1, 0, 1, 0];
+        for (let i = 0; i < N * N; i++) {
+            const y = 2 * Math.floor(i / N), x = 2 * (i % N), d = grid[i];
+            px[y * 2 * N + x] = ink;
+            px[(y + dr[d]) * 2 * N + x + dc[d]] = ink;
+        }
+        ctx.putImageData(image, 0, 0);
+        return;
+    }
+
+    canvas.width = canvas.height = size;
+    const ctx = canvas.getContext("2d");
+    const center = i => [margin + (i % N + 0.5) * cell, margin + (Math.floor(i / N) + 0.5) * cell];
+
+    // Walk the cycle from cell 0, a vertex only where the direction changes
+    const line = new Path2D();
+    line.moveTo(...center(0));
+    let u = 0;
+    for (let k = 0; k < N * N; k++) {
+        const v = u + offset[grid[u]];
+        if (grid[v] !== grid[u] || v === 0) line.lineTo(...center(v));
+        u = v;
+    }
+    line.closePath();
+    ctx.strokeStyle = color;
+    ctx.lineWidth = Math.max(1, cell * 0.1);
+    ctx.lineJoin = "round";
+    ctx.stroke(line);
+
+    const dots = new Path2D();
+    const radius = Math.max(1, cell * 0.1);
+    for (let i = 0; i < N * N; i++) {
+        const [x, y] = center(i);
+        dots.moveTo(x + radius, y);
+        dots.arc(x, y, radius, 0, 2 * Math.PI);
+    }
+    ctx.fillStyle = color;
+    ctx.fill(dots);
+}
+"""
+
+def iter_canvas(grid, size=SVG_SIZE, margin=MARGIN, color="#007bff", rows_per_chunk=1536):
+    # <canvas> and renderer script, the packed grid encoded a block of rows at
+    # a time. A block must hold a multiple of 12 cells: 12 cells are 3 packed
+    # bytes and 4 base64 characters, so the pieces join without padding.
+    N = grid.N
+    if (rows_per_chunk * N) % 12 != 0:
+        raise ValueError(f"rows_per_chunk={rows_per_chunk} times N={N} must be a multiple of 12 cells")
+    yield f'<canvas id="cycle" width="{size}" height="{size}"></canvas>\n'
+    yield f'    <script>{RENDERER_JS}\ndrawCycle(document.getElementById("cycle"), {N}, "'
+    view = grid.view()
+    for r in range(0, N, rows_per_chunk):
+        yield base64.b64encode(pack_grid(view[r:r + rows_per_chunk])).decode("ascii")
+    yield f'", {size}, {margin}, "{color}");\n    </script>'
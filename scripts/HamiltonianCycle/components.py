@@ -0,0 +1,125 @@
+from array import array
+
+import numpy as np
+
+# Component labeling for graphs over the N*N cells (node id = r * N + c).
+
+class UnionFind:
+    # Disjoint sets on int32 parent links with union by rank and iterative
+    # path compression (no recursion, so no recursion limit on big grids).
+    # array('i') keeps the links in one int32 buffer while staying fast for
+    # the scalar access of Python loops.
+    def __init__(self, n):
+        self.parent = array('i', range(n))
+        self.rank = bytearray(n)
+
+    @classmethod
+    def from_labels(cls, labels):
+        # Start from a labeling where every node points at its component's
+        # representative (labels[root] == root)
+        uf = cls(0)
+        uf.parent = array('i', np.asarray(labels, dtype=np.int32).tobytes())
+        uf.rank = bytearray(len(uf.parent))
+        for root in np.flatnonzero(labels == np.arange(len(labels))).tolist():
+            uf.rank[root] = 1
+        return uf
+
+    def find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i, j):
+        root_i = self.find(i)
+        root_j = self.find(j)
+        if root_i == root_j:
+            return False
+        rank = self.rank
+        if rank[root_i] < rank[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        if rank[root_i] == rank[root_j]:
+            rank[root_i] += 1
+        return True
+
+    def roots(self):
+        parent = np.frombuffer(self.parent, dtype=np.int32)
+        return np.flatnonzero(parent == np.arange(len(parent)))
+
+def label_permutation_cycles(succ):
+    # Label the cycles of a permutation succ (succ[u] = next node after u).
+    # Pointer jumping: after round k every node holds the smallest id among
+    # the next 2^k nodes of its cycle, so O(log n) vectorized rounds give
+    # every node the smallest id on its cycle.
+    succ = np.asarray(succ)
+    n = len(succ)
+    labels = np.arange(n, dtype=succ.dtype)
+    jump = succ
+    steps = 1
+    while steps < n:
+        labels = np.minimum(labels, labels[jump])
+        jump = jump[jump]
+        steps *= 2
+    return labels
+
+def count_permutation_cycles(succ, sample=16):
+    # Number of cycles of a permutation succ, for large n.
+    # Pointer jumping on all n nodes does log2(n) rounds of random gathers
+    # over the whole array, which dominates on big grids. Instead about one
+    # node in `sample` is marked, and all marked nodes walk forward in lockstep
+    # to the next marked node (O(n) gathers in total, the walk length is
+    # geometric). The marked nodes with these links form a permutation
+    # `sample` times smaller with the same cycles, except for cycles that hold
+    # no marked node at all; those are made of the nodes no walk passed and
+    # are counted separately.
+    succ = np.asarray(succ)
+    n = len(succ)
+    if n <= 1 << 16:
+        labels = label_permutation_cycles(succ)
+        return int(np.count_nonzero(labels == np.arange(n)))
+
+    # Fixed seed: the count does not depend on the sample
+    marked = np.random.default_rng(0).random(n) < 1 / sample
+    heads = np.flatnonzero(marked)
+    seen = marked.copy()
+    link = np.empty(len(heads), dtype=succ.dtype)
+
+    walkers = np.arange(len(heads))
+    pos = succ[heads]
+    while len(walkers):
+        hit = marked[pos]
+        link[walkers[hit]] = pos[hit]
+        walkers = walkers[~hit]
+        pos = pos[~hit]
+        seen[pos] = True
+        pos = succ[pos]
+
+    # Marked nodes renumbered 0..len(heads)-1
+    index = np.zeros(n, dtype=succ.dtype)
+    index[heads] = np.arange(len(heads), dtype=succ.dtype)
+    count = count_permutation_cycles(index[link], sample) if len(heads) else 0
+
+    rest = np.flatnonzero(~seen)
+    if len(rest):
+        index[rest] = np.arange(len(rest), dtype=succ.dtype)
+        count += count_permutation_cycles(index[succ[rest]], sample)
+    return count
+
+def label_matching_cycles(m1, m2):
+    # Label the cycles of the union of two perfect matchings m1, m2
+    # (m[u] = partner of u), e.g. the overlay of two domino tilings where every
+    # node has one edge of each.
+    #
+    # Walking a cycle alternates m1 and m2 edges, so f = m2 o m1 is a
+    # permutation that moves two steps along each cycle in a fixed direction.
+    # The f-orbits of u and m1[u] together cover u's cycle.
+    #
+    # Returns labels[u] = smallest node id on u's cycle.
+    m1 = np.asarray(m1, dtype=np.int32)
+    m2 = np.asarray(m2, dtype=np.int32)
+    labels = label_permutation_cycles(m2[m1])
+    return np.minimum(labels, labels[m1])
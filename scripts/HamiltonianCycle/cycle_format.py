@@ -0,0 +1,153 @@
+import sys
+import mmap
+import lzma
+import zlib
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+# Packed binary format for direction grids (.hcyc).
+#
+# Every cell holds one of the 4 direction codes, stored as code - 1 in 2 bits
+# (4 cells per byte, row-major, first cell in the low bits), so an N x N grid
+# takes N*N/4 bytes instead of ~2 bytes per cell of print_grid() text.
+# One file holds any number of cycles:
+#
+#   header   magic b'HCYC', version u16, reserved u16, count u32,
+#            reserved u32, index offset u64                        (24 bytes)
+#   records  N u32, codec u8, algorithm length u8, seed length u16,
+#            payload length u64, algorithm (utf-8), seed (utf-8), payload
+#   index    count x u64 record offsets
+#
+# All integers are little-endian. The seed is free-form text (an int, or
+# "seed:i" for the i-th cycle of a batch run). The payload is the packed grid,
+# optionally compressed with zlib or lzma. The index is written last, so
+# records can be streamed out; a reader maps the file and decodes only the
+# record it is asked for.
+
+MAGIC = b'HCYC'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIQ')
+RECORD = struct.Struct('<IBBHQ')
+
+CODECS = {'none': 0, 'zlib': 1, 'lzma': 2}
+CODEC_NAMES = {v: k for k, v in CODECS.items()}
+
+CycleRecord = namedtuple('CycleRecord', ['N', 'algorithm', 'seed', 'grid'])
+
+def pack_grid(grid):
+    # (N, N) direction codes -> 2-bit packed bytes
+    if hasattr(grid, 'view'):
+        grid = grid.view()
+    v = np.asarray(grid, dtype=np.uint8).ravel() - 1
+    if (v > 3).any():
+        raise ValueError("Grid holds codes outside 1-4, only complete cycles can be packed")
+    v = np.concatenate([v, np.zeros(-len(v) % 4, dtype=np.uint8)])
+    return (v[0::4] | (v[1::4] << 2) | (v[2::4] << 4) | (v[3::4] << 6)).tobytes()
+
+def unpack_grid(data, N):
+    packed = np.frombuffer(data, dtype=np.uint8)
+    v = np.empty((len(packed), 4), dtype=np.uint8)
+    for k in range(4):
+        v[:, k] = (packed >> (2 * k)) & 3
+    return (v.ravel()[:N * N] + 1).reshape(N, N)
+
+class CycleWriter:
+    def __init__(self, path, codec='none'):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', expected one of {sorted(CODECS)}")
+        self.codec = codec
+        self.f = open(path, 'wb')
+        self.offsets = []
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+
+    def write(self, grid, algorithm='', seed=None):
+        payload = pack_grid(grid)
+        if self.codec == 'zlib':
+            payload = zlib.compress(payload, 9)
+        elif self.codec == 'lzma':
+            payload = lzma.compress(payload)
+
+        N = len(grid.view() if hasattr(grid, 'view') else grid)
+        algorithm = algorithm.encode()
+        seed = b'' if seed is None else str(seed).encode()
+        self.offsets.append(self.f.tell())
+        self.f.write(RECORD.pack(N, CODECS[self.codec], len(algorithm), len(seed), len(payload)))
+        self.f.write(algorithm)
+        self.f.write(seed)
+        self.f.write(payload)
+
+    def close(self):
+        if self.f.closed:
+            return
+        index_offset = self.f.tell()
+        self.f.write(np.array(self.offsets, dtype='<u8').tobytes())
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, len(self.offsets), 0, index_offset))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CycleArchive:
+    # Random access to the cycles of a .hcyc file through mmap
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, _, index_offset = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a packed cycle file")
+        if version != VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+        self.offsets = np.frombuffer(self.mm, dtype='<u8', count=count, offset=index_offset)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        offset = int(self.offsets[i])
+        N, codec, alg_len, seed_len, payload_len = RECORD.unpack_from(self.mm, offset)
+        offset += RECORD.size
+        algorithm = self.mm[offset:offset + alg_len].decode()
+        offset += alg_len
+        seed = self.mm[offset:offset + seed_len].decode() or None
+        offset += seed_len
+
+        payload = memoryview(self.mm)[offset:offset + payload_len]
+        if CODEC_NAMES[codec] == 'zlib':
+            payload = zlib.decompress(payload)
+        elif CODEC_NAMES[codec] == 'lzma':
+            payload = lzma.decompress(payload)
+        grid = unpack_grid(payload, N)
+        del payload
+        return CycleRecord(N, algorithm, seed, grid)
+
+    def close(self):
+        # Drop our views of the map first, mmap refuses to close while exported
+        self.offsets = None
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def save_cycle(path, grid, algorithm='', seed=None, codec='none'):
+    with CycleWriter(path, codec) as writer:
+        writer.write(grid, algorithm, seed)
+
+def load_cycle(path, i=0):
+    with CycleArchive(path) as archive:
+        return archive[i]
+
+if __name__ == "__main__":
+    # List the cycles of a .hcyc file
+    with CycleArchive(sys.argv[1]) as archive:
+        for i in range(len(archive)):
+            record = archive[i]
+            print(f"{i}: {record.N}x{record.N} {record.algorithm or '?'} seed={record.seed}")
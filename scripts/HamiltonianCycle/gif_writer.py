@@ -0,0 +1,65 @@
+from PIL import Image, ImageChops, GifImagePlugin
+
+# Streaming GIF output for animations.
+#
+# Image.save(save_all=True, append_images=...) gathers every frame before the
+# first byte is written, so a long run holds all of them in memory. GifWriter
+# encodes each frame as soon as it arrives with PIL's GIF helpers
+# (getheader / getdata) and writes it straight to the file. Only the previous
+# frame (to find what changed) and one encoded frame (whose duration may still
+# grow) are kept:
+# - each frame is cropped to the box that differs from the previous one and
+#   drawn over it (disposal 0), with its own adaptive 256 color palette
+# - a frame identical to the previous one only adds its duration, like
+#   save_all does
+
+class GifWriter:
+    def __init__(self, filename, duration=200, loop=0):
+        self.f = open(filename, 'wb')
+        self.duration = duration
+        self.loop = loop
+        self.previous = None
+        self.pending = None # [frame, offset, duration] not written yet
+        self.count = 0
+
+    def write(self, frame):
+        frame = frame.convert('RGB')
+        if self.previous is None:
+            # Logical screen, global palette of the first frame, loop count
+            header, _ = GifImagePlugin.getheader(frame.convert('P', palette=Image.Palette.ADAPTIVE), info={'loop': self.loop})
+            self.f.write(b''.join(header))
+            bbox = (0, 0) + frame.size
+        else:
+            bbox = ImageChops.difference(frame, self.previous).getbbox()
+            if bbox is None:
+                self.pending[2] += self.duration
+                return
+
+        self.flush()
+        changed = frame.crop(bbox).convert('P', palette=Image.Palette.ADAPTIVE)
+        self.pending = [changed, bbox[:2], self.duration]
+        self.previous = frame
+
+    def flush(self):
+        if self.pending is None:
+            return
+        changed, offset, duration = self.pending
+        for data in GifImagePlugin.getdata(changed, offset, duration=duration, include_color_table=True):
+            self.f.write(data)
+        self.f.flush()
+        self.pending = None
+        self.count += 1
+
+    def close(self):
+        if self.f.closed:
+            return
+        self.flush()
+        if self.count:
+            self.f.write(b';') # Trailer
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,111 @@
+# Shared grid representation for all Hamiltonian Cycle scripts.
+#
+# Every cell stores the direction to the next cell of the cycle, using the
+# codes from genmap.cpp: 1: Left, 2: Up, 3: Right, 4: Down (0: unset).
+# The cells live in one contiguous row-major uint8 buffer, so an N x N grid
+# costs N*N bytes (4096x4096 -> 16 MB) instead of a list object per row and
+# a pointer per cell. The buffer can also be a memory-mapped .npy file, so a
+# solver can write a grid bigger than RAM straight to disk and other tools can
+# open it lazily (np.load(path, mmap_mode='r')).
+
+LEFT = 1
+UP = 2
+RIGHT = 3
+DOWN = 4
+
+class DirectionGrid:
+    def __init__(self, N, buffer=None):
+        self.N = N
+        self.mmap = None
+        if buffer is None:
+            self.data = bytearray(N * N)
+        else:
+            # Write through an existing buffer (e.g. shared memory or a memmap)
+            self.data = memoryview(buffer).cast('B')
+            if len(self.data) != N * N:
+                raise ValueError(f"Buffer holds {len(self.data)} bytes, expected {N * N}")
+
+    @classmethod
+    def memmap(cls, path, N):
+        # New (N, N) uint8 .npy file, every write goes to the file
+        import numpy as np
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(N, N))
+        grid = cls(N, array)
+        grid.mmap = array
+        return grid
+
+    @classmethod
+    def open(cls, path, mode='r+'):
+        # Existing .npy grid, mapped lazily ('r' for read-only)
+        import numpy as np
+        array = np.load(path, mmap_mode=mode)
+        if array.dtype != np.uint8 or array.ndim != 2 or array.shape[0] != array.shape[1]:
+            raise ValueError(f"{path} holds a {array.dtype} array of shape {array.shape}, expected (N, N) uint8")
+        grid = cls(array.shape[0], array)
+        grid.mmap = array
+        return grid
+
+    def flush(self):
+        # Push pending writes of a memory-mapped grid to disk
+        if self.mmap is not None:
+            self.mmap.flush()
+
+    def __getitem__(self, rc):
+        r, c = rc
+        return self.data[r * self.N + c]
+
+    def __setitem__(self, rc, d):
+        r, c = rc
+        self.data[r * self.N + c] = d
+
+    def fill(self, d):
+        self.data[:] = bytes([d]) * (self.N * self.N)
+
+    def row(self, r):
+        return self.data[r * self.N:(r + 1) * self.N]
+
+    def view(self):
+        # Zero-copy (N, N) uint8 NumPy view, writes go straight to the grid
+        import numpy as np
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.N, self.N)
+
+    def tolist(self):
+        return [list(self.row(r)) for r in range(self.N)]
+
+# Array helpers shared by the solvers and tools working on (R, C) NumPy
+# views of a direction grid.
+
+def successors(g):
+    # Flat id of the next cell for every cell (id = r * C + c)
+    import numpy as np
+    R, C = g.shape
+    offset = np.array([0, -1, -C, 1, C], dtype=np.int32)
+    return np.arange(R * C, dtype=np.int32) + offset[g.ravel()]
+
+# Two cycles touching a vertical boundary (between columns x-1 and x) with
+# antiparallel edges are joined by swapping those edges for two edges
+# crossing it:
+#
+# Case 1: (i, x-1) -> (i+1, x-1) [Down] and (i+1, x) -> (i, x) [Up]
+#     ->  (i, x-1) -> (i, x) [Right] and (i+1, x) -> (i+1, x-1) [Left]
+# Case 2: (i+1, x-1) -> (i, x-1) [Up] and (i, x) -> (i+1, x) [Down]
+#     ->  (i+1, x-1) -> (i+1, x) [Right] and (i, x) -> (i, x-1) [Left]
+#
+# Horizontal boundaries are vertical ones of the transposed grid, with codes
+# (Right, Left, Down, Up) in place of (Down, Up, Right, Left).
+
+def antiparallel_pairs(west, east, codes=(DOWN, UP, RIGHT, LEFT)):
+    # west / east: the cells on both sides of the boundary, rows along the
+    # first axis. Returns the case 1 and case 2 masks of every row i.
+    down, up = codes[:2]
+    case1 = (west[:-1] == down) & (east[1:] == up)
+    case2 = (west[1:] == up) & (east[:-1] == down)
+    return case1, case2
+
+def swap_pair(g, row, col, case1, codes=(DOWN, UP, RIGHT, LEFT)):
+    # Do the swap at rows (row, row + 1) across the boundary between columns
+    # col and col + 1; case1 is 1 for case 1, 0 for case 2. Takes scalars or
+    # arrays of swaps.
+    right, left = codes[2:]
+    g[row + 1 - case1, col] = right
+    g[row + case1, col + 1] = left
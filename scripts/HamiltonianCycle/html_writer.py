@@ -0,0 +1,72 @@
+import gzip
+from svg_path import iter_svg_cycle, iter_svg_lines
+from canvas_html import iter_canvas
+
+# Shared HTML output of all the solvers.
+#
+# The page is streamed: the header goes out first, then the pieces of the
+# drawing are gathered into chunks of about chunk_size characters and written
+# straight to the file, so memory stays bounded even for per-cell SVG of big
+# grids (tens of MB of markup). Output is gzip-compressed on the fly when asked
+# for, or when the filename ends in .gz (browsers open .html.gz served with
+# Content-Encoding: gzip, and zcat works everywhere).
+
+PAGE_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{title} {N}x{N}</title>
+    <style>
+        body {{ font-family: sans-serif; text-align: center; padding: 0; margin: 0; }}
+        h1 {{ margin: 10px; }}
+        {element} {{ border: 1px solid #ccc; background: #f9f9f9; }}
+    </style>
+</head>
+<body>
+    <h1>{title} ({N}x{N})</h1>
+    """
+
+PAGE_TAIL = """
+</body>
+</html>
+"""
+
+MODES = ("path", "lines", "canvas")
+
+def write_page(filename, title, N, parts, element="svg", compress=None, chunk_size=1 << 16):
+    if compress is None:
+        compress = filename.endswith(".gz")
+    if compress:
+        f = gzip.open(filename, "wt", encoding="utf-8")
+    else:
+        f = open(filename, "w", encoding="utf-8")
+
+    with f:
+        f.write(PAGE_HEAD.format(title=title, N=N, element=element))
+        chunk = []
+        size = 0
+        for part in parts:
+            chunk.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                f.write("".join(chunk))
+                chunk = []
+                size = 0
+        f.write("".join(chunk))
+        f.write(PAGE_TAIL)
+
+def write_cycle_html(filename, title, grid, mode="path", grid_lines=False, compress=None):
+    # mode "path" draws the cycle as one compact <path> (see svg_path.py),
+    # "lines" as one <line> and <circle> per cell, "canvas" embeds the
+    # packed grid and draws it with JS (see canvas_html.py)
+    if mode == "path":
+        parts = iter_svg_cycle(grid, grid_lines=grid_lines)
+    elif mode == "lines":
+        parts = iter_svg_lines(grid, grid_lines=grid_lines)
+    elif mode == "canvas":
+        parts = iter_canvas(grid)
+    else:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+
+    write_page(filename, title, grid.N, parts, element="canvas" if mode == "canvas" else "svg", compress=compress)
+    print(f"HTML visualization saved to {filename}")
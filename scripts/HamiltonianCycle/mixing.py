@@ -0,0 +1,62 @@
+import numpy as np
+
+# Mixing diagnostics for the Backbite Markov chain.
+#
+# The chain records a few cheap observables at a fixed interval. The
+# integrated autocorrelation time tau of each series (in samples) tells how
+# many samples are worth one independent draw, so the effective sample size
+# is roughly T / tau. tau is re-estimated whenever the series has grown by a
+# constant factor, which keeps the total estimation cost O(T log T).
+#
+# An estimate of tau is only trusted once the series is min_length * tau
+# samples long (Sokal recommends about 50), which by itself means an ESS of at
+# least min_length. So the chain stops at ESS >= max(target_ess, min_length);
+# lower min_length to stop earlier for small targets, at the cost of a less
+# reliable tau.
+
+def autocorr_time(x, c=5.0):
+    # Integrated autocorrelation time with Sokal's automatic window:
+    # tau(M) = 1 + 2 * sum_{t=1..M} rho(t), with the smallest M >= c * tau(M)
+    x = np.asarray(x, dtype=float)
+    T = len(x)
+    x = x - x.mean()
+    var = np.dot(x, x) / T
+    if T < 2 or var == 0:
+        # No fluctuation seen yet, nothing can be estimated
+        return float('inf')
+
+    f = np.fft.rfft(x, n=2 * T)
+    rho = np.fft.irfft(f * np.conjugate(f))[:T] / (T * var)
+    taus = 2.0 * np.cumsum(rho) - 1.0
+    window = np.arange(T) >= c * taus
+    if not window.any():
+        return float('inf')
+    return max(1.0, float(taus[np.argmax(window)]))
+
+class MixingMonitor:
+    def __init__(self, min_samples=32, growth=1.25, min_length=50):
+        self.samples = []
+        self.min_samples = min_samples
+        self.growth = growth
+        self.min_length = min_length
+        self.next_check = min_samples
+        self.tau = float('inf')
+        self.ess = 0.0
+
+    def add(self, *values):
+        self.samples.append(values)
+
+    def converged(self, target_ess):
+        T = len(self.samples)
+        if T < self.next_check:
+            return False
+        self.next_check = max(T + 1, int(T * self.growth))
+
+        # The first half is burn-in; the slowest observable sets tau
+        kept = np.asarray(self.samples[T // 2:], dtype=float)
+        self.tau = max(autocorr_time(kept[:, i]) for i in range(kept.shape[1]))
+        self.ess = len(kept) / self.tau
+
+        # Also require the series to be long compared to tau, otherwise the
+        # estimate itself is not reliable
+        return self.ess >= target_ess and len(kept) >= self.min_length * self.tau
@@ -0,0 +1,315 @@
+import sys
+import time
+import heapq
+from array import array
+import numpy as np
+from config import N
+from grid import DirectionGrid, LEFT, UP, RIGHT, DOWN
+from rng import IntStream
+from components import UnionFind
+
+# 2x2-block construction of Hamiltonian cycles with interchangeable tree engines.
+#
+# The N x N grid is covered with 2x2 loops, one per block of the (N/2)x(N/2)
+# coarse grid. Merging two neighboring loops along an edge of a spanning tree
+# of the coarse grid keeps a single cycle, so every spanning tree gives a
+# Hamiltonian cycle. Only the tree builder differs between the methods.
+#
+# An engine is a function (R, C, rng) -> (us, vs), the tree edges as two
+# int32 arrays of coarse node ids u = r * C + c. Building the tree and writing
+# it into the grid are separate steps: all merges are applied afterwards in
+# one vectorized pass (see compile_tree()).
+
+# Cells rewritten by a merge, per (is_ccw, edge type): (row, col, direction)
+# relative to the fine top-left cell of the left / upper block
+MERGE_CELLS = {
+    # CW: A_tr -> B_tl, B_bl -> A_br
+    (False, 'right'): ((0, 1, RIGHT), (1, 2, LEFT)),
+    # CCW: A_br -> B_bl, B_tl -> A_tr
+    (True, 'right'): ((1, 1, RIGHT), (0, 2, LEFT)),
+    # CW: A_br -> B_tr, B_tl -> A_bl
+    (False, 'down'): ((1, 1, DOWN), (2, 0, UP)),
+    # CCW: A_bl -> B_tl, B_tr -> A_br
+    (True, 'down'): ((1, 0, DOWN), (2, 1, UP)),
+}
+
+class TreeEdges:
+    # Tree edges collected in two int32 buffers
+    def __init__(self):
+        self.us = array('i')
+        self.vs = array('i')
+
+    def __len__(self):
+        return len(self.us)
+
+    def add(self, u, v):
+        self.us.append(u)
+        self.vs.append(v)
+
+    def arrays(self):
+        return np.frombuffer(self.us, dtype=np.int32), np.frombuffer(self.vs, dtype=np.int32)
+
+def coarse_neighbors(R, C):
+    # Neighbor ids of every node of the R x C grid
+    nbrs = []
+    for r in range(R):
+        for c in range(C):
+            nb = []
+            if r > 0: nb.append((r - 1) * C + c)
+            if r < R - 1: nb.append((r + 1) * C + c)
+            if c > 0: nb.append(r * C + c - 1)
+            if c < C - 1: nb.append(r * C + c + 1)
+            nbrs.append(tuple(nb))
+    return nbrs
+
+def walk_table(R, C):
+    # Neighbor tuples repeated to length 12 (divisible by 2, 3 and 4), so a
+    # random int in [0, 12) picks a uniform neighbor without any modulo
+    return [nb * (12 // len(nb)) if nb else () for nb in coarse_neighbors(R, C)]
+
+def coarse_edges(R, C):
+    # All edges of the R x C grid as two id arrays (horizontal, then vertical)
+    ids = np.arange(R * C).reshape(R, C)
+    us = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    vs = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    return us, vs
+
+def dfs_tree(R, C, rng):
+    # Iterative randomized DFS from node 0: long corridors, few branches
+    nbrs = coarse_neighbors(R, C)
+    pick = IntStream(rng, 12)
+    visited = bytearray(R * C)
+    visited[0] = 1
+    stack = [0]
+    edges = TreeEdges()
+    while stack:
+        u = stack[-1]
+        # Uniform choice among the unvisited neighbors
+        candidates = [v for v in nbrs[u] if not visited[v]]
+        if not candidates:
+            stack.pop()
+            continue
+        v = candidates[pick() % len(candidates)]
+        visited[v] = 1
+        stack.append(v)
+        edges.add(u, v)
+    return edges.arrays()
+
+def wilson_tree(R, C, rng):
+    # Wilson's algorithm: loop-erased random walks, a uniform spanning tree
+    K = R * C
+    nbrs = walk_table(R, C)
+
+    # 'in_tree' tracks nodes IN THE TREE
+    in_tree = bytearray(K)
+
+    # next_node[u] = id the walk last left u through. Re-visiting a node
+    # overwrites its entry, which erases the loop automatically.
+    next_node = array('i', bytes(4 * K))
+
+    # Arbitrarily pick a root and add to tree
+    in_tree[int(rng.integers(K))] = 1
+
+    # Walk directions are drawn in chunks of ints in [0, 12)
+    moves = []
+    k = 0
+
+    # Start walks from the nodes in a random order, skipping those already in
+    # the tree (each node is looked at once, no rejection loop)
+    edges = TreeEdges()
+    for start in rng.permutation(K).tolist():
+        if in_tree[start]:
+            continue
+
+        # Loop-Erased Random Walk until hitting the tree
+        u = start
+        while not in_tree[u]:
+            if k == len(moves):
+                moves = rng.integers(0, 12, size=1 << 16).tolist()
+                k = 0
+            v = nbrs[u][moves[k]]
+            k += 1
+            next_node[u] = v
+            u = v
+
+        # Retrace path and add it to the tree
+        u = start
+        while not in_tree[u]:
+            in_tree[u] = 1
+            v = next_node[u]
+            edges.add(u, v)
+            u = v
+    return edges.arrays()
+
+def aldous_broder_tree(R, C, rng):
+    # Aldous-Broder: one random walk, every node is attached through the edge
+    # it is first entered by. Uniform like Wilson, but needs the full cover time.
+    K = R * C
+    nbrs = walk_table(R, C)
+    visited = bytearray(K)
+    u = int(rng.integers(K))
+    visited[u] = 1
+    remaining = K - 1
+
+    moves = []
+    k = 0
+    edges = TreeEdges()
+    while remaining:
+        if k == len(moves):
+            moves = rng.integers(0, 12, size=1 << 16).tolist()
+            k = 0
+        v = nbrs[u][moves[k]]
+        k += 1
+        if not visited[v]:
+            visited[v] = 1
+            edges.add(u, v)
+            remaining -= 1
+        u = v
+    return edges.arrays()
+
+def kruskal_tree(R, C, rng):
+    # Randomized Kruskal: edges in random order, kept when they join two trees
+    K = R * C
+    us, vs = coarse_edges(R, C)
+    order = rng.permutation(len(us))
+    uf = UnionFind(K)
+    edges = TreeEdges()
+    for u, v in zip(us[order].tolist(), vs[order].tolist()):
+        if uf.union(u, v):
+            edges.add(u, v)
+            if len(edges) == K - 1:
+                break
+    return edges.arrays()
+
+def prim_tree(R, C, rng):
+    # Randomized Prim: grow one tree, always taking the cheapest frontier edge
+    # under i.i.d. random edge weights (a heap of (weight, u, v))
+    K = R * C
+    nbrs = coarse_neighbors(R, C)
+    in_tree = bytearray(K)
+
+    # Every edge is pushed at most once (when its first endpoint joins), and
+    # the grid has fewer than 2K edges
+    weights = iter(rng.random(2 * K).tolist())
+
+    heap = []
+    edges = TreeEdges()
+    u = int(rng.integers(K))
+    while True:
+        in_tree[u] = 1
+        for v in nbrs[u]:
+            if not in_tree[v]:
+                heapq.heappush(heap, (next(weights), u, v))
+
+        # Next frontier edge that still leads out of the tree
+        while heap:
+            _, w, u = heapq.heappop(heap)
+            if not in_tree[u]:
+                edges.add(w, u)
+                break
+        else:
+            return edges.arrays()
+
+ENGINES = {
+    'dfs': dfs_tree,
+    'wilson': wilson_tree,
+    'aldous-broder': aldous_broder_tree,
+    'kruskal': kruskal_tree,
+    'prim': prim_tree,
+}
+
+class SpanningTreeCycle:
+    def __init__(self, N=N, seed=None, engine='dfs', grid=None):
+        if N % 2 != 0:
+            raise ValueError("N must be even for 2x2 block construction")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINES)}")
+        self.N = N
+        self.grid = DirectionGrid(N) if grid is None else grid
+        self.engine = engine
+        self.is_ccw = False # Store the orientation choice
+        self.rng = np.random.default_rng(seed)
+
+        # Directions: 1: Left, 2: Up, 3: Right, 4: Down (Matching genmap.cpp)
+        self.LEFT = 1
+        self.UP = 2
+        self.RIGHT = 3
+        self.DOWN = 4
+
+    def solve(self):
+        start = time.perf_counter()
+
+        # 1. Initialize with 2x2 loops in every block
+        self.initialize_blocks()
+        init_done = time.perf_counter()
+
+        # 2. Generate Spanning Tree on (N/2)x(N/2) coarse grid
+        R, C = self.N // 2, self.N // 2
+        us, vs = ENGINES[self.engine](R, C, self.rng)
+        tree_done = time.perf_counter()
+
+        # 3. Merge the loops along the tree edges
+        self.compile_tree(us, vs)
+        merge_done = time.perf_counter()
+
+        self.stats = {
+            'engine': self.engine,
+            'init_time': init_done - start,
+            'tree_time': tree_done - init_done,
+            'merge_time': merge_done - tree_done,
+        }
+        return True
+
+    def initialize_blocks(self):
+        # Randomly choose between Clockwise (CW) and Counter-Clockwise (CCW) for the whole grid
+        self.is_ccw = bool(self.rng.integers(2))
+
+        # Corners of all blocks at once: top-left, top-right, bottom-left, bottom-right
+        g = self.grid.view()
+        if not self.is_ccw:
+            # CW
+            corners = (self.RIGHT, self.DOWN, self.UP, self.LEFT)
+        else:
+            # CCW
+            corners = (self.DOWN, self.LEFT, self.RIGHT, self.UP)
+        g[0::2, 0::2], g[0::2, 1::2], g[1::2, 0::2], g[1::2, 1::2] = corners
+
+    def compile_tree(self, us, vs):
+        # Every tree edge rewrites a fixed pair of cells that only depends on
+        # its orientation, so all merges of one edge type are a single scatter
+        # into the flat grid. Edges are first ordered so that u is the left /
+        # upper block.
+        C = self.N // 2
+        lo = np.minimum(us, vs).astype(np.int64)
+        hi = np.maximum(us, vs).astype(np.int64)
+        flat = self.grid.view().reshape(-1)
+        for edge_type, mask in (('right', hi - lo == 1), ('down', hi - lo == C)):
+            r, c = np.divmod(lo[mask], C)
+            # Fine top-left cell of the left / upper block
+            base = 2 * r * self.N + 2 * c
+            for dr, dc, d in MERGE_CELLS[(self.is_ccw, edge_type)]:
+                flat[base + dr * self.N + dc] = d
+
+    def print_grid(self):
+        for y in range(self.N):
+            row_str = []
+            for x in range(self.N):
+                row_str.append(str(self.grid[y, x]))
+            print(",".join(row_str) + ",")
+        print("\n----------\n")
+
+if __name__ == "__main__":
+    # Compare the engines: spanning_tree.py [N] [engine ...]
+    if len(sys.argv) > 1:
+        try:
+            N = int(sys.argv[1])
+        except:
+            pass
+    engines = sys.argv[2:] or list(ENGINES)
+
+    for engine in engines:
+        solver = SpanningTreeCycle(N, engine=engine)
+        solver.solve()
+        s = solver.stats
+        total = s['init_time'] + s['tree_time'] + s['merge_time']
+        print(f"{engine:>14}: tree {s['tree_time']:.3f}s, merge {s['merge_time']:.3f}s, total {total:.3f}s")
@@ -0,0 +1,141 @@
+from config import SVG_SIZE, MARGIN
+from grid import LEFT, UP, RIGHT, DOWN
+
+# SVG output for a direction grid, produced as a stream of string pieces
+# (see html_writer.py), so that memory stays flat however big the grid is.
+#
+# Compact form (iter_svg_cycle): instead of one <line> and one <circle> per
+# cell, the cycle is walked once and every straight run becomes a single
+# relative h/v command of one <path>. Coordinates are in cell units (cell
+# centers at integers) and a transform scales them to the drawing, so the
+# commands stay short integers. The dots are a second path with a vertex per
+# cell and a circle marker on every vertex. An N=512 cycle takes a few hundred
+# KB instead of tens of MB.
+#
+# Per-cell form (iter_svg_lines): the original one <line> + <circle> per cell.
+
+def iter_runs(grid):
+    # Walk the successor map from every cell not yet drawn. Yields
+    # ('M', r, c) at the start of a walk, [direction, length] for every
+    # straight run and ('z',) when the walk came back to its start.
+    # A full cycle gives one closed walk, broken grids a few open ones.
+    N = grid.N
+    data = grid.data
+    offset = {LEFT: -1, UP: -N, RIGHT: 1, DOWN: N}
+    seen = bytearray(N * N)
+    for start in range(N * N):
+        if seen[start] or data[start] == 0:
+            continue
+        yield ('M', start // N, start % N)
+        run = None
+        u = start
+        while True:
+            seen[u] = 1
+            d = data[u]
+            if d == 0:
+                break
+            v = u + offset[d]
+            # Moves leaving the grid end the walk
+            if not 0 <= v < N * N or (d in (LEFT, RIGHT) and v // N != u // N):
+                break
+            if run and run[0] == d:
+                run[1] += 1
+            else:
+                if run:
+                    yield run
+                run = [d, 1]
+            if v == start or seen[v]:
+                break
+            u = v
+        if run:
+            yield run
+        if run and v == start:
+            yield ('z',)
+
+def iter_path_d(grid):
+    # One subpath per walk, straight runs merged
+    for token in iter_runs(grid):
+        if token[0] == 'M':
+            yield f"M{token[2]} {token[1]}"
+        elif token[0] == 'z':
+            yield "z"
+        else:
+            d, length = token
+            if d == LEFT: yield f"h-{length}"
+            elif d == RIGHT: yield f"h{length}"
+            elif d == UP: yield f"v-{length}"
+            else: yield f"v{length}"
+
+def iter_dots_d(grid):
+    # A vertex on every cell ("h1 1 1" repeats the command), so that
+    # marker-start / marker-mid put a dot on each of them
+    for token in iter_runs(grid):
+        if token[0] == 'M':
+            yield f"M{token[2]} {token[1]}"
+        elif token[0] != 'z':
+            d, length = token
+            step = "-1" if d in (LEFT, UP) else "1"
+            yield ("h" if d in (LEFT, RIGHT) else "v") + " ".join([step] * length)
+
+def iter_grid_lines(N, svg_size, margin):
+    # Faint cell borders, one path in pixels
+    cell_size = (svg_size - 2 * margin) / N
+    yield '<path d="'
+    for i in range(N + 1):
+        pos = margin + i * cell_size
+        yield f"M{pos:g} {margin}V{svg_size - margin}M{margin} {pos:g}H{svg_size - margin}"
+    yield '" stroke="#eee" stroke-width="1" fill="none" />'
+
+def iter_svg_cycle(grid, svg_size=SVG_SIZE, margin=MARGIN, color="#007bff", dots=True, grid_lines=False):
+    N = grid.N
+    cell_size = (svg_size - 2 * margin) / N
+    # Same look as the per-cell output: 10% of a cell, at least 1px
+    width = max(1, cell_size * 0.1) / cell_size
+    origin = margin + cell_size / 2
+
+    yield f'<svg width="{svg_size}" height="{svg_size}" xmlns="http://www.w3.org/2000/svg">'
+    if grid_lines:
+        yield from iter_grid_lines(N, svg_size, margin)
+    yield f'<g transform="translate({origin:g} {origin:g}) scale({cell_size:g})">'
+    yield '<path d="'
+    yield from iter_path_d(grid)
+    yield f'" stroke="{color}" stroke-width="{width:g}" stroke-linejoin="round" fill="none" />'
+    if dots:
+        yield (f'<defs><marker id="dot" markerUnits="userSpaceOnUse" markerWidth="{2 * width:g}" '
+               f'markerHeight="{2 * width:g}" refX="{width:g}" refY="{width:g}">'
+               f'<circle cx="{width:g}" cy="{width:g}" r="{width:g}" fill="{color}" /></marker></defs>')
+        yield '<path d="'
+        yield from iter_dots_d(grid)
+        yield '" fill="none" stroke="none" marker-start="url(#dot)" marker-mid="url(#dot)" marker-end="url(#dot)" />'
+    yield '</g></svg>'
+
+def iter_svg_lines(grid, svg_size=SVG_SIZE, margin=MARGIN, color="#007bff", grid_lines=False):
+    N = grid.N
+    cell_size = (svg_size - 2 * margin) / N
+    stroke_width = max(1, cell_size * 0.1)
+    radius = max(1, cell_size * 0.1)
+    steps = {LEFT: (-1, 0), UP: (0, -1), RIGHT: (1, 0), DOWN: (0, 1)}
+
+    yield f'<svg width="{svg_size}" height="{svg_size}" xmlns="http://www.w3.org/2000/svg">'
+    if grid_lines:
+        for i in range(N + 1):
+            pos = margin + i * cell_size
+            yield f'<line x1="{pos}" y1="{margin}" x2="{pos}" y2="{svg_size - margin}" stroke="#eee" stroke-width="1" />'
+            yield f'<line x1="{margin}" y1="{pos}" x2="{svg_size - margin}" y2="{pos}" stroke="#eee" stroke-width="1" />'
+
+    # Draw Path
+    for y in range(N):
+        row = grid.row(y)
+        for x in range(N):
+            direction = row[x]
+            if direction == 0: continue
+
+            x1 = margin + x * cell_size + cell_size / 2
+            y1 = margin + y * cell_size + cell_size / 2
+            dx, dy = steps[direction]
+            x2 = x1 + dx * cell_size
+            y2 = y1 + dy * cell_size
+
+            yield f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{color}" stroke-width="{stroke_width}" />'
+            yield f'<circle cx="{x1}" cy="{y1}" r="{radius}" fill="{color}" />'
+    yield '</svg>'
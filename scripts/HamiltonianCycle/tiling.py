@@ -0,0 +1,143 @@
+import argparse
+import contextlib
+from multiprocessing import Pool
+
+import numpy as np
+from config import N
+
+from batch import ALGORITHMS, _generate_one
+from components import UnionFind
+from grid import LEFT, UP, RIGHT, DOWN, successors, antiparallel_pairs, swap_pair
+from validate import validate_cycle
+
+# Tiled generation of cycles too big for one solver call.
+# The N x N grid is split into square tiles, each one solved independently on
+# a process pool by any of the batch solvers. The tile cycles are then joined
+# into one cycle by swapping a pair of antiparallel edges across tile
+# boundaries (the same swap as in the Recursive merges), along a random
+# spanning tree over the tiles. Only one tile at a time plus the output
+# buffer (optionally a memory-mapped .npy file) is held in memory.
+
+OPPOSITE = np.array([0, RIGHT, DOWN, LEFT, UP], dtype=np.uint8)
+
+def orient_clockwise(tile):
+    # Reverse a tile's cycle if it runs counter-clockwise (on screen).
+    # With one orientation for all tiles, the edges along the right border of
+    # a tile run opposite to those along the left border of its neighbor, so
+    # every boundary offers antiparallel pairs to swap.
+    rows, cols = tile.shape
+    flat = tile.ravel()
+    ids = np.arange(rows * cols)
+    succ = successors(tile)
+
+    # Twice the signed area (shoelace over the cell centers); > 0 is clockwise
+    # with rows growing downwards
+    r, c = np.divmod(ids, cols)
+    nr, nc = np.divmod(succ, cols)
+    if np.sum(c * nr - nc * r) > 0:
+        return tile
+
+    # Reversed cycle: the successor points back along the same edge
+    reversed_flat = np.empty_like(flat)
+    reversed_flat[succ] = OPPOSITE[flat]
+    return reversed_flat.reshape(rows, cols)
+
+def _build_tile(task):
+    # Same worker as batch.py, oriented for stitching
+    size = task[1]
+    tile = np.frombuffer(_generate_one(task), dtype=np.uint8).reshape(size, size)
+    return orient_clockwise(tile).tobytes()
+
+def stitch(g, x, start, length, codes, rng):
+    # Join the cycles on both sides of the boundary between columns x-1 and x,
+    # rows [start, start + length), with a random one of the antiparallel
+    # pairs along it (see antiparallel_pairs / swap_pair in grid.py, same swap
+    # as in the Recursive merges). Horizontal boundaries are handled on the
+    # transposed grid.
+    west = np.asarray(g[start:start + length, x - 1])
+    east = np.asarray(g[start:start + length, x])
+    case1, case2 = antiparallel_pairs(west, east, codes)
+    candidates = np.flatnonzero(case1 | case2)
+    if not len(candidates):
+        return False
+
+    i = int(candidates[rng.integers(len(candidates))])
+    swap_pair(g, start + i, x - 1, int(case1[i]), codes)
+    return True
+
+def stitch_tiles(g, tile, rng):
+    # Randomized Kruskal over the tile grid: boundaries in random order, each
+    # stitched when it joins two different cycles
+    tiles = g.shape[0] // tile
+    horizontal = (DOWN, UP, RIGHT, LEFT)
+    vertical = (RIGHT, LEFT, DOWN, UP)
+
+    boundaries = []
+    for r in range(tiles):
+        for c in range(tiles):
+            if c + 1 < tiles: # Right neighbor
+                boundaries.append((r * tiles + c, r * tiles + c + 1, g, (c + 1) * tile, r * tile, horizontal))
+            if r + 1 < tiles: # Bottom neighbor
+                boundaries.append((r * tiles + c, (r + 1) * tiles + c, g.T, (r + 1) * tile, c * tile, vertical))
+
+    uf = UnionFind(tiles * tiles)
+    joined = 0
+    for k in rng.permutation(len(boundaries)).tolist():
+        a, b, view, x, start, codes = boundaries[k]
+        if uf.find(a) != uf.find(b) and stitch(view, x, start, tile, codes, rng):
+            uf.union(a, b)
+            joined += 1
+    if joined != tiles * tiles - 1:
+        raise RuntimeError(f"No antiparallel edges left to swap, {len(uf.roots())} cycles remain")
+
+def generate_tiled(algorithm, N, tile, jobs=None, seed=None, out=None, validate=True):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {sorted(ALGORITHMS)}")
+    if tile % 2 != 0 or N % tile != 0:
+        raise ValueError(f"Tile size {tile} must be even and divide N={N}")
+    tiles = N // tile
+
+    if out is not None:
+        grid = np.lib.format.open_memmap(out, mode='w+', dtype=np.uint8, shape=(N, N))
+    else:
+        grid = np.zeros((N, N), dtype=np.uint8)
+
+    # One child seed per tile, the last one drives the stitching
+    seeds = np.random.SeedSequence(seed).spawn(tiles * tiles + 1)
+    tasks = [(algorithm, tile, s, validate) for s in seeds[:-1]]
+
+    with contextlib.ExitStack() as stack:
+        if jobs == 1:
+            results = map(_build_tile, tasks)
+        else:
+            pool = stack.enter_context(Pool(jobs))
+            # imap hands back one tile at a time, in tile order
+            results = pool.imap(_build_tile, tasks)
+
+        for k, data in enumerate(results):
+            r, c = divmod(k, tiles)
+            grid[r * tile:(r + 1) * tile, c * tile:(c + 1) * tile] = \
+                np.frombuffer(data, dtype=np.uint8).reshape(tile, tile)
+
+    stitch_tiles(grid, tile, np.random.default_rng(seeds[-1]))
+    if validate:
+        validate_cycle(grid)
+
+    if out is not None:
+        grid.flush()
+    return grid
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate one large Hamiltonian cycle from independently solved tiles")
+    parser.add_argument("algorithm", choices=sorted(ALGORITHMS))
+    parser.add_argument("N", type=int, nargs="?", default=N)
+    parser.add_argument("tile", type=int, nargs="?", default=None, help="tile size (default: N / 4)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("-o", "--out", default="HamiltonianCycleTiled.npy", help="(N, N) uint8 .npy file")
+    parser.add_argument("--no-validate", dest="validate", action="store_false", help="skip the single-cycle check of every tile")
+    args = parser.parse_args()
+
+    tile = args.tile or args.N // 4
+    generate_tiled(args.algorithm, args.N, tile, jobs=args.jobs, seed=args.seed, out=args.out, validate=args.validate)
+    print(f"{args.N}x{args.N} cycle ({tile}x{tile} {args.algorithm} tiles) saved to {args.out}")
@@ -0,0 +1,70 @@
+import sys
+import numpy as np
+from grid import LEFT, UP, RIGHT, DOWN, successors
+from components import count_permutation_cycles
+
+# Check that a direction grid is one Hamiltonian cycle.
+#
+# Works on any grid of direction codes 1: Left, 2: Up, 3: Right, 4: Down
+# (a DirectionGrid, a NumPy array or nested lists) without walking the cycle
+# in Python: the successor map is built with array operations, the in-degrees
+# are counted with bincount and the cycles are counted with vectorized
+# pointer walks (see count_permutation_cycles() in components.py).
+
+def validate_cycle(grid):
+    # Raises ValueError describing the first problem found
+    if hasattr(grid, 'view'):
+        grid = grid.view()
+    g = np.asarray(grid)
+    if g.ndim != 2:
+        raise ValueError(f"Expected a 2D grid, got shape {g.shape}")
+    R, C = g.shape
+
+    bad = (g < LEFT) | (g > DOWN)
+    if bad.any():
+        r, c = np.argwhere(bad)[0]
+        raise ValueError(f"Cell ({r}, {c}) has invalid direction {g[r, c]}")
+
+    # Only cells on the border can leave the grid
+    outside = np.zeros((R, C), dtype=bool)
+    outside[:, 0] |= g[:, 0] == LEFT
+    outside[:, -1] |= g[:, -1] == RIGHT
+    outside[0, :] |= g[0, :] == UP
+    outside[-1, :] |= g[-1, :] == DOWN
+    if outside.any():
+        r, c = np.argwhere(outside)[0]
+        raise ValueError(f"Cell ({r}, {c}) moves outside the grid")
+
+    # Successor of every cell as a flat id
+    succ = successors(g)
+
+    # Every cell must be entered exactly once, i.e. succ is a permutation
+    indegree = np.bincount(succ, minlength=R * C)
+    if (indegree != 1).any():
+        r, c = divmod(int(np.flatnonzero(indegree != 1)[0]), C)
+        raise ValueError(f"Cell ({r}, {c}) is entered {indegree[r * C + c]} times")
+
+    num_cycles = count_permutation_cycles(succ)
+    if num_cycles != 1:
+        raise ValueError(f"Grid holds {num_cycles} cycles instead of one")
+
+def is_hamiltonian_cycle(grid):
+    try:
+        validate_cycle(grid)
+    except ValueError:
+        return False
+    return True
+
+if __name__ == "__main__":
+    # Check every grid of a stacked (count, N, N) .npy file (see batch.py)
+    grids = np.load(sys.argv[1] if len(sys.argv) > 1 else "HamiltonianCycles.npy", mmap_mode='r')
+    if grids.ndim == 2:
+        grids = grids[None]
+    failed = 0
+    for i, g in enumerate(grids):
+        try:
+            validate_cycle(g)
+        except ValueError as e:
+            failed += 1
+            print(f"Grid {i}: {e}")
+    print(f"{len(grids) - failed}/{len(grids)} grids are Hamiltonian cycles")